@@ -0,0 +1,278 @@
+"""
+Lambda artifact builder.
+
+Runs inside the CDK bundling container (see `TelegramBotStack._bundling_options`) and replaces the
+old `pip install -r requirements.txt -t /asset-output && cp -au . /asset-output` one-liner:
+
+1. Installs dependencies into the output directory (no bytecode, no pip cache).
+2. Prunes packages the Lambda runtime already provides (boto3/botocore) and dead weight
+   (tests, type stubs, pip/setuptools leftovers).
+3. Copies the function source and strips caches and dist-info bloat.
+4. Precompiles bytecode so cold starts do not compile `.py` files on the read-only `/var/task`.
+5. Reports artifact size and the measured import time of the top-level modules.
+
+Only the standard library is used, so the script runs on the bare bundling image.
+
+Usage:
+    python build_lambda.py --source /asset-input --output /asset-output
+"""
+
+from __future__ import annotations
+
+import argparse
+import compileall
+import py_compile
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Provided by the AWS Lambda Python runtime, no need to ship them
+DEFAULT_PRUNE_PACKAGES = ["boto3", "botocore", "s3transfer"]
+
+# Never needed at runtime
+ALWAYS_PRUNE_PACKAGES = ["pip", "setuptools", "wheel", "_distutils_hack", "pkg_resources"]
+
+# Directory names removed anywhere in the dependency tree
+PRUNE_DIR_NAMES = {"__pycache__", "tests", "test", "docs", "examples", "benchmarks"}
+
+# File suffixes removed anywhere in the artifact
+PRUNE_FILE_SUFFIXES = {".pyi", ".pyc", ".pyo", ".c", ".h", ".pxd", ".pyx", ".md", ".rst"}
+
+# Kept inside *.dist-info (importlib.metadata and licensing still work)
+DIST_INFO_KEEP = {"METADATA", "LICENSE", "LICENSE.txt", "LICENSE.md", "NOTICE", "entry_points.txt", "top_level.txt"}
+
+# Source files/directories never copied into the artifact
+SOURCE_EXCLUDES = {"requirements.txt", "tests", "__pycache__", ".venv", ".pytest_cache", ".DS_Store"}
+
+
+def _normalize(name: str) -> str:
+    """Normalize a distribution name (PEP 503) for comparison."""
+    return name.lower().replace("-", "_").replace(".", "_")
+
+
+def install_requirements(requirements: Path, output: Path) -> None:
+    """Install dependencies into the output directory."""
+    if not requirements.exists():
+        print(f"No {requirements.name} found, skipping dependency install")
+        return
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--requirement",
+            str(requirements),
+            "--target",
+            str(output),
+            "--no-compile",
+            "--no-cache-dir",
+            "--disable-pip-version-check",
+            "--quiet",
+        ],
+        check=True,
+    )
+
+
+def _top_level_names(dist_info: Path) -> set[str]:
+    """Return the top-level import names owned by a distribution."""
+    names = {dist_info.name.split("-")[0]}
+    top_level = dist_info / "top_level.txt"
+    if top_level.exists():
+        names.update(line.strip() for line in top_level.read_text().splitlines() if line.strip())
+    return names
+
+
+def prune_packages(output: Path, packages: list[str]) -> list[str]:
+    """
+    Remove whole distributions (code + dist-info) from the output directory.
+
+    Returns:
+        The list of removed distribution names.
+    """
+    targets = {_normalize(p) for p in packages}
+    removed = []
+
+    for dist_info in sorted(output.glob("*.dist-info")):
+        dist_name = dist_info.name.split("-")[0]
+        if _normalize(dist_name) not in targets:
+            continue
+
+        for name in _top_level_names(dist_info):
+            for candidate in (output / name, output / f"{name}.py"):
+                if candidate.is_dir():
+                    shutil.rmtree(candidate)
+                elif candidate.exists():
+                    candidate.unlink()
+
+        shutil.rmtree(dist_info)
+        removed.append(dist_name)
+
+    # Leftover console scripts are never used inside Lambda
+    bin_dir = output / "bin"
+    if bin_dir.is_dir():
+        shutil.rmtree(bin_dir)
+
+    return removed
+
+
+def strip_bloat(output: Path) -> int:
+    """
+    Remove caches, tests, stubs and dist-info files not needed at runtime.
+
+    Returns:
+        Number of bytes removed.
+    """
+    freed = 0
+
+    # Walk bottom-up so directories are handled after their contents
+    for path in sorted(output.rglob("*"), key=lambda p: len(p.parts), reverse=True):
+        if not path.exists() or path.is_symlink():
+            continue
+
+        if path.is_dir():
+            # Only prune test/doc directories inside dependencies, never top-level source packages
+            if path.name in PRUNE_DIR_NAMES and (path.parent != output or path.name == "__pycache__"):
+                freed += _tree_size(path)
+                shutil.rmtree(path)
+            continue
+
+        if path.parent.name.endswith(".dist-info"):
+            if path.name not in DIST_INFO_KEEP:
+                freed += path.stat().st_size
+                path.unlink()
+            continue
+
+        if path.suffix in PRUNE_FILE_SUFFIXES:
+            freed += path.stat().st_size
+            path.unlink()
+
+    return freed
+
+
+def copy_source(source: Path, output: Path) -> None:
+    """Copy the function source code on top of the installed dependencies."""
+    for item in source.iterdir():
+        if item.name in SOURCE_EXCLUDES:
+            continue
+
+        target = output / item.name
+        if item.is_dir():
+            shutil.copytree(item, target, dirs_exist_ok=True, ignore=shutil.ignore_patterns(*SOURCE_EXCLUDES, "*.pyc"))
+        else:
+            shutil.copy2(item, target)
+
+
+def precompile(output: Path) -> bool:
+    """
+    Precompile bytecode for the runtime interpreter.
+
+    UNCHECKED_HASH pycs are never revalidated against the source mtime, so the interpreter
+    loads them without a stat() per module (the artifact is immutable anyway).
+    """
+    return compileall.compile_dir(
+        str(output),
+        quiet=1,
+        workers=0,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+
+def _tree_size(path: Path) -> int:
+    """Return the total size in bytes of all files under path."""
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file() and not f.is_symlink())
+
+
+def measure_import_time(output: Path, modules: list[str]) -> dict[str, float]:
+    """
+    Measure the cold import time of each module in a fresh interpreter.
+
+    Returns:
+        Mapping of module name to import time in milliseconds (-1 if the import failed).
+    """
+    results = {}
+    for module in modules:
+        code = (
+            "import time, importlib\n"
+            "start = time.perf_counter()\n"
+            f"importlib.import_module({module!r})\n"
+            "print((time.perf_counter() - start) * 1000)\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(output),
+            capture_output=True,
+            text=True,
+        )
+        results[module] = float(proc.stdout.strip()) if proc.returncode == 0 else -1.0
+    return results
+
+
+def report(output: Path, removed: list[str], freed: int, import_times: dict[str, float]) -> None:
+    """Print a build summary with artifact size and import timings."""
+    total = _tree_size(output)
+    files = sum(1 for f in output.rglob("*") if f.is_file())
+
+    sizes = sorted(
+        ((child.name, _tree_size(child) if child.is_dir() else child.stat().st_size) for child in output.iterdir()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    print("=" * 60)
+    print(f"Artifact: {output}")
+    print(f"Total size: {total / 1024 / 1024:.2f} MiB in {files} files")
+    print(f"Pruned packages: {', '.join(removed) if removed else 'none'}")
+    print(f"Stripped bloat: {freed / 1024:.1f} KiB")
+    print("Largest entries:")
+    for name, size in sizes[:10]:
+        print(f"  {size / 1024:>10.1f} KiB  {name}")
+    if import_times:
+        print("Import time (fresh interpreter):")
+        for module, elapsed in import_times.items():
+            status = f"{elapsed:.1f} ms" if elapsed >= 0 else "FAILED"
+            print(f"  {module}: {status}")
+    print("=" * 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an optimized Lambda artifact.")
+    parser.add_argument("--source", type=Path, default=Path("/asset-input"), help="Function source directory")
+    parser.add_argument("--output", type=Path, default=Path("/asset-output"), help="Artifact output directory")
+    parser.add_argument("--requirements", default="requirements.txt", help="Requirements file inside --source")
+    parser.add_argument(
+        "--prune",
+        nargs="*",
+        default=DEFAULT_PRUNE_PACKAGES,
+        help="Distributions to drop because the runtime provides them",
+    )
+    parser.add_argument(
+        "--measure-import",
+        nargs="*",
+        default=[],
+        help="Modules whose cold import time is reported (e.g. requests aws_lambda_powertools)",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    output = args.output
+    output.mkdir(parents=True, exist_ok=True)
+
+    install_requirements(args.source / args.requirements, output)
+    removed = prune_packages(output, [*args.prune, *ALWAYS_PRUNE_PACKAGES])
+    copy_source(args.source, output)
+    freed = strip_bloat(output)
+
+    if not precompile(output):
+        sys.exit("Bytecode compilation failed")
+
+    import_times = measure_import_time(output, args.measure_import)
+    report(output, removed, freed, import_times)
+    print(f"Build finished in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
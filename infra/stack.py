@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import json
 import os
+import re
 from pathlib import Path
 from typing import Any
 
-from aws_cdk import BundlingOptions, CfnOutput, Duration, RemovalPolicy, Stack
+from aws_cdk import BundlingOptions, CfnOutput, DockerVolume, Duration, RemovalPolicy, Stack
 from aws_cdk import aws_apigatewayv2 as apigwv2
 from aws_cdk import aws_apigatewayv2_integrations as apigwv2_integrations
 from aws_cdk import aws_dynamodb as dynamodb
+from aws_cdk import aws_events as events
+from aws_cdk import aws_events_targets as events_targets
 from aws_cdk import aws_lambda as _lambda
 from aws_cdk import aws_lambda_event_sources as lambda_event_sources
 from aws_cdk import aws_logs as logs
@@ -15,10 +19,37 @@ from aws_cdk import aws_sqs as sqs
 from constructs import Construct
 from dotenv import load_dotenv
 
+# Directory holding build_lambda.py, mounted into the bundling container
+BUILD_TOOLS_DIR = Path(__file__).parent
+BUILD_TOOLS_MOUNT = "/build-tools"
+
 
 class TelegramBotStack(Stack):
     """CDK stack defining the Telegram bot serverless architecture."""
 
+    @staticmethod
+    def _bundling_options(runtime: _lambda.Runtime, measure_import: list[str]) -> BundlingOptions:
+        """
+        Bundle a Lambda package with build_lambda.py.
+
+        Prunes runtime-provided packages (boto3/botocore), strips caches and dist-info bloat,
+        precompiles bytecode and prints artifact size plus import timings in the synth output.
+        """
+        return BundlingOptions(
+            image=runtime.bundling_image,
+            volumes=[DockerVolume(host_path=str(BUILD_TOOLS_DIR), container_path=BUILD_TOOLS_MOUNT)],
+            command=[
+                "python",
+                f"{BUILD_TOOLS_MOUNT}/build_lambda.py",
+                "--source",
+                "/asset-input",
+                "--output",
+                "/asset-output",
+                "--measure-import",
+                *measure_import,
+            ],
+        )
+
     def __init__(self, scope: Construct, construct_id: str, env_name: str = "dev", **kwargs: Any) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
@@ -38,6 +69,18 @@ class TelegramBotStack(Stack):
         if not telegram_bot_token or not telegram_webhook_secret_token:
             raise ValueError("TELEGRAM_BOT_TOKEN and TELEGRAM_WEBHOOK_SECRET_TOKEN must be set")
 
+        # Additional bots served by the same Lambdas (webhook: /webhook/<bot_id>), as JSON:
+        # {"<bot_id>": {"token": "...", "secret_token": "..."}, ...}
+        # Note: Lambda environment variables are limited to 4 KB per function in total.
+        extra_bots = json.loads(os.environ.get("TELEGRAM_BOTS") or "{}")
+        for bot_id, bot in extra_bots.items():
+            if bot_id == "default" or not re.fullmatch(r"[A-Za-z0-9_-]{1,64}", bot_id):
+                raise ValueError(f"Invalid bot_id in TELEGRAM_BOTS: {bot_id!r}")
+            if not bot.get("token") or not bot.get("secret_token"):
+                raise ValueError(f"TELEGRAM_BOTS[{bot_id!r}] needs a token and a secret_token")
+        bot_tokens = json.dumps({bot_id: bot["token"] for bot_id, bot in extra_bots.items()})
+        bot_secret_tokens = json.dumps({bot_id: bot["secret_token"] for bot_id, bot in extra_bots.items()})
+
         project_name_prefix = f"TG{env_name.capitalize()}"
         stack_name_prefix = f"tg-{env_name}"
 
@@ -51,6 +94,7 @@ class TelegramBotStack(Stack):
 
         self.common_env_vars = {
             "POWERTOOLS_LOG_LEVEL": log_level,
+            "POWERTOOLS_METRICS_NAMESPACE": f"TelegramBot-{env_name}",
             "ENV_NAME": env_name,
         }
 
@@ -88,6 +132,65 @@ class TelegramBotStack(Stack):
 
         self.tg_users_table = dynamodb.Table(self, **tg_users_table_kwargs)
 
+        # Telegram file_id cache (content hash -> file_id), shared by all worker containers
+        self.tg_file_ids_table = dynamodb.Table(
+            self,
+            f"{project_name_prefix}FileIdsTable",
+            table_name=f"{stack_name_prefix}-file-ids",
+            partition_key=dynamodb.Attribute(
+                name="content_key",
+                type=dynamodb.AttributeType.STRING,
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=removal_policy,
+        )
+
+        # Cached command responses shared by worker containers (items expire via TTL)
+        self.tg_response_cache_table = dynamodb.Table(
+            self,
+            f"{project_name_prefix}ResponseCacheTable",
+            table_name=f"{stack_name_prefix}-response-cache",
+            partition_key=dynamodb.Attribute(
+                name="cache_key",
+                type=dynamodb.AttributeType.STRING,
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
+        # Scheduled jobs: minute buckets (partition) of jobs (sort), plus delivery markers
+        self.tg_scheduled_jobs_table = dynamodb.Table(
+            self,
+            f"{project_name_prefix}ScheduledJobsTable",
+            table_name=f"{stack_name_prefix}-scheduled-jobs",
+            partition_key=dynamodb.Attribute(
+                name="bucket",
+                type=dynamodb.AttributeType.STRING,
+            ),
+            sort_key=dynamodb.Attribute(
+                name="job_id",
+                type=dynamodb.AttributeType.STRING,
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=removal_policy,
+        )
+
+        # Per-user rate limit counters for the receiver (items expire via TTL)
+        self.rate_limit_table = dynamodb.Table(
+            self,
+            f"{project_name_prefix}RateLimitTable",
+            table_name=f"{stack_name_prefix}-rate-limits",
+            partition_key=dynamodb.Attribute(
+                name="user_id",
+                type=dynamodb.AttributeType.NUMBER,
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
         # ============================================================================
         # SQS Queues
         # ============================================================================
@@ -104,20 +207,36 @@ class TelegramBotStack(Stack):
             removal_policy=queue_removal_policy,
         )
 
+        # Priority lanes: each lane gets its own queue (sharing the DLQ) and its own
+        # worker concurrency/batching, so free-text floods cannot delay /commands or buttons.
+        # The "default" lane keeps the original updates queue.
+        lane_settings = {
+            "default": {"queue_name": "updates-queue", "batch_size": 10, "batching_window": 1, "max_concurrency": 4},
+            "commands": {"queue_name": "commands-queue", "batch_size": 1, "batching_window": 0, "max_concurrency": 4},
+            "callbacks": {"queue_name": "callbacks-queue", "batch_size": 1, "batching_window": 0, "max_concurrency": 2},
+            # Inline queries arrive per keystroke: batches let the worker drop the superseded ones
+            "inline": {"queue_name": "inline-queue", "batch_size": 10, "batching_window": 0, "max_concurrency": 2},
+        }
+
+        self.lane_queues: dict[str, sqs.Queue] = {}
+        for lane, settings in lane_settings.items():
+            construct_id = "UpdatesQueue" if lane == "default" else f"{lane.capitalize()}Queue"
+            self.lane_queues[lane] = sqs.Queue(
+                self,
+                f"{project_name_prefix}{construct_id}",
+                queue_name=f"{stack_name_prefix}-{settings['queue_name']}",
+                retention_period=Duration.hours(1),
+                visibility_timeout=Duration.seconds(90),
+                receive_message_wait_time=Duration.seconds(20),
+                removal_policy=queue_removal_policy,
+                dead_letter_queue=sqs.DeadLetterQueue(
+                    max_receive_count=3,
+                    queue=self.dlq,
+                ),
+            )
+
         # Main updates Queue
-        self.updates_queue = sqs.Queue(
-            self,
-            f"{project_name_prefix}UpdatesQueue",
-            queue_name=f"{stack_name_prefix}-updates-queue",
-            retention_period=Duration.hours(1),
-            visibility_timeout=Duration.seconds(90),
-            receive_message_wait_time=Duration.seconds(20),
-            removal_policy=queue_removal_policy,
-            dead_letter_queue=sqs.DeadLetterQueue(
-                max_receive_count=3,
-                queue=self.dlq,
-            ),
-        )
+        self.updates_queue = self.lane_queues["default"]
 
         # ============================================================================
         # Lambda Functions
@@ -138,24 +257,55 @@ class TelegramBotStack(Stack):
             code=_lambda.Code.from_asset(
                 str(project_root / "src" / "receiver"),
                 exclude=exclude_files,
-                bundling=BundlingOptions(
-                    image=lambda_runtime.bundling_image,
-                    command=[
-                        "bash",
-                        "-c",
-                        "pip install -r requirements.txt -t /asset-output && cp -au . /asset-output",
-                    ],
-                ),
+                bundling=self._bundling_options(lambda_runtime, measure_import=["aws_lambda_powertools"]),
             ),
             environment={
                 **self.common_env_vars,
                 "QUEUE_URL": self.updates_queue.queue_url,
+                "COMMANDS_QUEUE_URL": self.lane_queues["commands"].queue_url,
+                "CALLBACKS_QUEUE_URL": self.lane_queues["callbacks"].queue_url,
+                "INLINE_QUEUE_URL": self.lane_queues["inline"].queue_url,
                 "WEBHOOK_SECRET_TOKEN": telegram_webhook_secret_token,
+                "BOT_SECRET_TOKENS": bot_secret_tokens,
+                "RATE_LIMIT_TABLE_NAME": self.rate_limit_table.table_name,
+                "RATE_LIMIT_MAX_UPDATES": "20",
+                "RATE_LIMIT_WINDOW_SECONDS": "10",
+                "RATE_LIMIT_ACTION": "drop",
             },
         )
 
         # Least-privilege grants
-        self.updates_queue.grant_send_messages(self.receiver_lambda)
+        for queue in self.lane_queues.values():
+            queue.grant_send_messages(self.receiver_lambda)
+        self.rate_limit_table.grant_read_write_data(self.receiver_lambda)
+
+        # Worker code and configuration are shared by the worker and the scheduler sweeper
+        worker_code = _lambda.Code.from_asset(
+            str(project_root / "src" / "worker"),
+            exclude=exclude_files,
+            bundling=self._bundling_options(lambda_runtime, measure_import=["requests", "aws_lambda_powertools"]),
+        )
+        worker_environment = {
+            **self.common_env_vars,
+            "DEFAULT_LANG": "en",
+            "TELEGRAM_API_BASE": "https://api.telegram.org/bot",
+            "TG_USERS_TABLE_NAME": self.tg_users_table.table_name,
+            "TG_FILE_IDS_TABLE_NAME": self.tg_file_ids_table.table_name,
+            "TG_RESPONSE_CACHE_TABLE_NAME": self.tg_response_cache_table.table_name,
+            "TG_SCHEDULED_JOBS_TABLE_NAME": self.tg_scheduled_jobs_table.table_name,
+            "QUEUE_URL": self.updates_queue.queue_url,
+            "BOT_TOKEN": telegram_bot_token,
+            "BOT_TOKENS": bot_tokens,
+            "WEBHOOK_SECRET_TOKEN": telegram_webhook_secret_token,
+            "BOT_NAME": "Example Bot",
+            "BOT_DESCRIPTION": "Example Bot Description",
+            "BOT_INSTRUCTIONS": "Example Bot Instructions",
+            # Open Telegram/DynamoDB connections during init ("false" to compare first-update latency)
+            "PREWARM_CONNECTIONS": "true",
+            # Memory profiling: set to e.g. "500" with a low sample rate to hunt leaks in warm containers
+            "MEMORY_PROFILE_EVERY_N": "0",
+            "MEMORY_PROFILE_SAMPLE_RATE": "0.1",
+        }
 
         # Worker Lambda - processes queue messages and talks to DynamoDB / Telegram API
         self.worker_lambda = _lambda.Function(
@@ -166,43 +316,56 @@ class TelegramBotStack(Stack):
             handler="main.lambda_handler",
             timeout=Duration.seconds(60),
             log_retention=logs.RetentionDays.ONE_WEEK,
-            code=_lambda.Code.from_asset(
-                str(project_root / "src" / "worker"),
-                exclude=exclude_files,
-                bundling=BundlingOptions(
-                    image=lambda_runtime.bundling_image,
-                    command=[
-                        "bash",
-                        "-c",
-                        "pip install -r requirements.txt -t /asset-output && cp -au . /asset-output",
-                    ],
-                ),
-            ),
-            environment={
-                **self.common_env_vars,
-                "DEFAULT_LANG": "en",
-                "TELEGRAM_API_BASE": "https://api.telegram.org/bot",
-                "TG_USERS_TABLE_NAME": self.tg_users_table.table_name,
-                "BOT_TOKEN": telegram_bot_token,
-                "WEBHOOK_SECRET_TOKEN": telegram_webhook_secret_token,
-                "BOT_NAME": "Example Bot",
-                "BOT_DESCRIPTION": "Example Bot Description",
-                "BOT_INSTRUCTIONS": "Example Bot Instructions",
-            },
+            code=worker_code,
+            environment=worker_environment,
         )
 
         # Grant least-privilege access to the worker lambda
-        self.updates_queue.grant_consume_messages(self.worker_lambda)
         self.tg_users_table.grant_read_write_data(self.worker_lambda)
+        self.tg_file_ids_table.grant_read_write_data(self.worker_lambda)
+        self.tg_response_cache_table.grant_read_write_data(self.worker_lambda)
+        self.tg_scheduled_jobs_table.grant_read_write_data(self.worker_lambda)
+        # Short scheduled delays are sent back to the updates queue with DelaySeconds
+        self.updates_queue.grant_send_messages(self.worker_lambda)
+
+        # One SQS event source per lane, each with its own batching and concurrency
+        for lane, settings in lane_settings.items():
+            self.lane_queues[lane].grant_consume_messages(self.worker_lambda)
+            self.worker_lambda.add_event_source(
+                lambda_event_sources.SqsEventSource(
+                    self.lane_queues[lane],
+                    batch_size=settings["batch_size"],
+                    max_batching_window=Duration.seconds(settings["batching_window"]),
+                    max_concurrency=settings["max_concurrency"],  # Maximum concurrent invocations for this lane
+                    # The worker hands back records it had no time left for; only those are redelivered
+                    report_batch_item_failures=True,
+                ),
+            )
 
-        # Add SQS event source with max concurrency of 10
-        self.worker_lambda.add_event_source(
-            lambda_event_sources.SqsEventSource(
-                self.updates_queue,
-                batch_size=1,  # Process one message at a time
-                max_batching_window=Duration.seconds(0),
-                max_concurrency=10,  # Maximum concurrent invocations from SQS
-            ),
+        # Scheduler sweeper - every minute, moves due scheduled jobs onto the updates queue.
+        # Reserved concurrency 1 keeps sweeps from overlapping.
+        self.sweeper_lambda = _lambda.Function(
+            self,
+            f"{project_name_prefix}SchedulerSweeperLambda",
+            function_name=f"{stack_name_prefix}-scheduler-sweeper",
+            runtime=lambda_runtime,
+            handler="sweeper.lambda_handler",
+            timeout=Duration.seconds(50),
+            reserved_concurrent_executions=1,
+            log_retention=logs.RetentionDays.ONE_WEEK,
+            code=worker_code,
+            environment=worker_environment,
+        )
+
+        self.tg_scheduled_jobs_table.grant_read_write_data(self.sweeper_lambda)
+        self.updates_queue.grant_send_messages(self.sweeper_lambda)
+
+        events.Rule(
+            self,
+            f"{project_name_prefix}SchedulerSweepRule",
+            rule_name=f"{stack_name_prefix}-scheduler-sweep",
+            schedule=events.Schedule.rate(Duration.minutes(1)),
+            targets=[events_targets.LambdaFunction(self.sweeper_lambda)],
         )
 
         # ============================================================================
@@ -221,12 +384,17 @@ class TelegramBotStack(Stack):
             handler=self.receiver_lambda,
         )
 
-        # Add POST /webhook route
+        # Add POST /webhook route (default bot) and POST /webhook/{bot_id} (bots from TELEGRAM_BOTS)
         self.webhook_api.add_routes(
             path="/webhook",
             methods=[apigwv2.HttpMethod.POST],
             integration=webhook_integration,
         )
+        self.webhook_api.add_routes(
+            path="/webhook/{bot_id}",
+            methods=[apigwv2.HttpMethod.POST],
+            integration=webhook_integration,
+        )
 
         # ============================================================================
         # Outputs
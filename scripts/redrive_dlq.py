@@ -0,0 +1,533 @@
+"""
+Dead-letter queue redrive and replay tool.
+
+Drains `tg-{env}-updates-dlq` (or any queue) with parallel long-polling ReceiveMessage calls,
+optionally filters the messages, and replays the matching ones:
+
+- `--mode queue` (default): back onto the queue they came from (DeadLetterQueueSourceArn, so
+  every message returns to its priority lane) or onto `--target-queue-url`, with SendMessageBatch.
+  Message attributes (lane, bot_id) are preserved.
+- `--mode dispatch`: straight through an in-process worker Dispatcher (needs the worker's
+  environment variables, e.g. TG_USERS_TABLE_NAME and BOT_TOKEN). As in the worker, errors
+  inside handlers are logged by the Dispatcher and do not fail the message.
+
+Only messages that were replayed successfully are deleted from the DLQ. Skipped and failed
+messages (and, in `--dry-run`, all messages) stay hidden while the run lasts (their visibility
+timeout is extended in the background) and are made visible again when the run ends. Every
+message is handled at most once per run, even if SQS delivers it again.
+
+Without `--queue-url` the tool runs against a local in-memory SQS stand-in loaded from
+`--local-file` (JSON lines: raw Telegram updates or SQS messages with Body/MessageAttributes),
+so filters and replays can be tried without AWS credentials.
+
+Usage:
+    python scripts/redrive_dlq.py --queue-url https://sqs.../tg-dev-updates-dlq --command /start --dry-run
+    python scripts/redrive_dlq.py --queue-url https://sqs.../tg-dev-updates-dlq --update-type callback_query
+    python scripts/redrive_dlq.py --local-file dlq.jsonl --target-queue-url local://updates --wait-seconds 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+# SQS limits
+MAX_BATCH_SIZE = 10
+MAX_WAIT_SECONDS = 20
+
+# Attributes describing the failure; used by --error and not replayed
+ERROR_ATTRIBUTES = ("ErrorCode", "ErrorMessage", "error")
+
+# Print progress every N received messages
+PROGRESS_EVERY = 1000
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+# ----------------------------------------------------------------------------
+# Local SQS stand-in
+# ----------------------------------------------------------------------------
+
+
+class InMemorySQS:
+    """
+    Thread-safe in-memory subset of the boto3 SQS client used by this tool.
+
+    Queues are created on first use and addressed by any URL; visibility timeouts,
+    receipt handles and long polling behave like SQS.
+    """
+
+    def __init__(self) -> None:
+        self.queues: dict[str, list[dict[str, Any]]] = {}
+        self._condition = threading.Condition()
+
+    def load(self, queue_url: str, path: Path) -> int:
+        """Load messages from a JSON lines file (raw updates or {"Body", "MessageAttributes"} objects)."""
+        count = 0
+        with path.open() as lines:
+            for line in lines:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if "Body" not in item:
+                    item = {"Body": json.dumps(item)}
+                self._append(queue_url, item.get("Body"), item.get("MessageAttributes"), item.get("Attributes"))
+                count += 1
+        return count
+
+    def get_queue_url(self, QueueName: str) -> dict[str, Any]:
+        return {"QueueUrl": f"local://{QueueName}"}
+
+    def receive_message(
+        self,
+        QueueUrl: str,
+        MaxNumberOfMessages: int = 1,
+        WaitTimeSeconds: int = 0,
+        VisibilityTimeout: int = 30,
+        **_: Any,
+    ) -> dict[str, Any]:
+        deadline = time.monotonic() + WaitTimeSeconds
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                visible = [m for m in self.queues.get(QueueUrl, []) if m["visible_at"] <= now]
+                if visible or now >= deadline:
+                    break
+                self._condition.wait(deadline - now)
+
+            messages = []
+            for message in visible[:MaxNumberOfMessages]:
+                message["visible_at"] = now + VisibilityTimeout
+                message["ReceiptHandle"] = uuid.uuid4().hex
+                attributes = message["Attributes"]
+                attributes["ApproximateReceiveCount"] = str(int(attributes.get("ApproximateReceiveCount", "0")) + 1)
+                messages.append({k: message[k] for k in ("MessageId", "ReceiptHandle", "Body", "Attributes")})
+                messages[-1]["MessageAttributes"] = dict(message["MessageAttributes"])
+        return {"Messages": messages} if messages else {}
+
+    def send_message_batch(self, QueueUrl: str, Entries: list[dict[str, Any]]) -> dict[str, Any]:
+        for entry in Entries:
+            self._append(QueueUrl, entry["MessageBody"], entry.get("MessageAttributes"), None)
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: list[dict[str, Any]]) -> dict[str, Any]:
+        handles = {entry["ReceiptHandle"] for entry in Entries}
+        with self._condition:
+            queue = self.queues.get(QueueUrl, [])
+            queue[:] = [m for m in queue if m.get("ReceiptHandle") not in handles]
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    def change_message_visibility_batch(self, QueueUrl: str, Entries: list[dict[str, Any]]) -> dict[str, Any]:
+        timeouts = {entry["ReceiptHandle"]: entry["VisibilityTimeout"] for entry in Entries}
+        with self._condition:
+            for message in self.queues.get(QueueUrl, []):
+                if message.get("ReceiptHandle") in timeouts:
+                    message["visible_at"] = time.monotonic() + timeouts[message["ReceiptHandle"]]
+            self._condition.notify_all()
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    def _append(self, queue_url: str, body: str, message_attributes: Any, attributes: Any) -> None:
+        with self._condition:
+            self.queues.setdefault(queue_url, []).append(
+                {
+                    "MessageId": uuid.uuid4().hex,
+                    "Body": body,
+                    "MessageAttributes": message_attributes or {},
+                    "Attributes": {"SentTimestamp": str(int(time.time() * 1000)), **(attributes or {})},
+                    "visible_at": 0.0,
+                }
+            )
+            self._condition.notify_all()
+
+
+# ----------------------------------------------------------------------------
+# Filters
+# ----------------------------------------------------------------------------
+
+
+def update_type(body: dict[str, Any]) -> str:
+    """The update's payload key ("message", "callback_query", ..., or "scheduled_job")."""
+    return next((key for key in body if key != "update_id"), "unknown")
+
+
+def update_command(body: dict[str, Any]) -> str | None:
+    """The bot command of a message update ("/start@my_bot x" -> "/start")."""
+    text = (body.get("message") or {}).get("text") or ""
+    if not text.startswith("/"):
+        return None
+    return text.split()[0].split("@")[0]
+
+
+def message_error(message: dict[str, Any]) -> str:
+    """The failure recorded on a message (empty if none)."""
+    attributes = message.get("MessageAttributes", {})
+    return " ".join(attributes[name].get("StringValue", "") for name in ERROR_ATTRIBUTES if name in attributes)
+
+
+def build_filter(args: argparse.Namespace) -> Callable[[dict[str, Any], dict[str, Any]], bool]:
+    """Combine the CLI filters (all given filters must match)."""
+    commands = {"/" + command.lstrip("/") for command in args.command or []}
+
+    def matches(message: dict[str, Any], body: dict[str, Any]) -> bool:
+        if args.update_type and update_type(body) not in args.update_type:
+            return False
+        if commands and update_command(body) not in commands:
+            return False
+        if args.error and args.error.lower() not in message_error(message).lower():
+            return False
+        return True
+
+    return matches
+
+
+# ----------------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------------
+
+
+class QueueReplayer:
+    """Sends messages back to their source queue (or a fixed target) with SendMessageBatch."""
+
+    def __init__(self, sqs: Any, target_queue_url: str | None):
+        self.sqs = sqs
+        self.target_queue_url = target_queue_url
+        self._queue_urls: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def replay(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Return the messages SQS accepted."""
+        by_target: dict[str, list[dict[str, Any]]] = {}
+        for message in messages:
+            target = self._target(message)
+            if target is None:
+                print(f"No target queue for message {message['MessageId']}, use --target-queue-url", file=sys.stderr)
+                continue
+            by_target.setdefault(target, []).append(message)
+
+        replayed = []
+        for target, group in by_target.items():
+            by_id = {str(i): message for i, message in enumerate(group)}
+            entries = [
+                {"Id": entry_id, "MessageBody": message["Body"], "MessageAttributes": _replay_attributes(message)}
+                for entry_id, message in by_id.items()
+            ]
+            try:
+                response = self.sqs.send_message_batch(QueueUrl=target, Entries=entries)
+            except Exception as e:
+                print(f"SendMessageBatch to {target} failed: {e}", file=sys.stderr)
+                continue
+            for failure in response.get("Failed", []):
+                print(f"Replay failed: {failure}", file=sys.stderr)
+            replayed.extend(by_id[item["Id"]] for item in response.get("Successful", []))
+        return replayed
+
+    def _target(self, message: dict[str, Any]) -> str | None:
+        if self.target_queue_url:
+            return self.target_queue_url
+
+        source_arn = message.get("Attributes", {}).get("DeadLetterQueueSourceArn")
+        if not source_arn:
+            return None
+        with self._lock:
+            if source_arn not in self._queue_urls:
+                queue_name = source_arn.rsplit(":", 1)[-1]
+                self._queue_urls[source_arn] = self.sqs.get_queue_url(QueueName=queue_name)["QueueUrl"]
+            return self._queue_urls[source_arn]
+
+
+class DispatchReplayer:
+    """Processes messages with the worker's Dispatcher in this process."""
+
+    def __init__(self) -> None:
+        # The worker imports its packages both as top-level modules and as `worker.*`
+        sys.path[:0] = [str(REPO_ROOT / "src" / "worker"), str(REPO_ROOT / "src")]
+
+        from core.bots import BotRegistry, get_bot_id
+        from repositories import BOT_TOKENS, QUEUE_URL, TG_RESPONSE_CACHE_TABLE_NAME, TG_SCHEDULED_JOBS_TABLE_NAME
+        from repositories.queue_client import UpdatesQueueClient
+        from repositories.response_cache_repo import ResponseCacheRepository
+        from repositories.scheduled_job_repository import ScheduledJobRepository
+        from repositories.user_repository import UserRepository
+        from services.handlers import register_handlers
+
+        scheduling_enabled = bool(QUEUE_URL and TG_SCHEDULED_JOBS_TABLE_NAME)
+        self._get_bot_id = get_bot_id
+        self._registry = BotRegistry(
+            BOT_TOKENS,
+            setup=register_handlers,
+            user_repo=UserRepository(),
+            response_cache_repo=ResponseCacheRepository() if TG_RESPONSE_CACHE_TABLE_NAME else None,
+            job_repo=ScheduledJobRepository() if scheduling_enabled else None,
+            queue=UpdatesQueueClient() if scheduling_enabled else None,
+        )
+        # Handlers and their caches are written for the worker's single thread
+        self._lock = threading.Lock()
+
+    def replay(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        replayed = []
+        for message in messages:
+            # Same shape as a Lambda SQS record, for get_bot_id
+            record = {
+                "messageAttributes": {
+                    name: {"stringValue": value.get("StringValue")}
+                    for name, value in message.get("MessageAttributes", {}).items()
+                }
+            }
+            try:
+                with self._lock:
+                    self._registry.get(self._get_bot_id(record)).process_update(json.loads(message["Body"]))
+            except Exception as e:
+                print(f"Dispatch of message {message['MessageId']} failed: {e}", file=sys.stderr)
+                continue
+            replayed.append(message)
+        return replayed
+
+
+def _replay_attributes(message: dict[str, Any]) -> dict[str, Any]:
+    """Message attributes to send again (lane, bot_id, ...), without the failure details."""
+    return {
+        name: {key: value[key] for key in ("DataType", "StringValue", "BinaryValue") if key in value}
+        for name, value in message.get("MessageAttributes", {}).items()
+        if name not in ERROR_ATTRIBUTES
+    }
+
+
+# ----------------------------------------------------------------------------
+# Redrive
+# ----------------------------------------------------------------------------
+
+
+class RedriveStats:
+    """Counters shared by the pollers."""
+
+    FIELDS = ("received", "matched", "replayed", "deleted", "skipped", "failed", "invalid")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int) -> int:
+        """Add to the counters and return the new `received` total."""
+        with self._lock:
+            for name, value in counts.items():
+                self.counts[name] += value
+            return self.counts["received"]
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.counts["received"] / elapsed if elapsed else 0.0
+        replay_rate = self.counts["replayed"] / elapsed if elapsed else 0.0
+        counts = ", ".join(f"{name}={value}" for name, value in self.counts.items())
+        return f"{counts} in {elapsed:.1f}s ({rate:.1f} received/s, {replay_rate:.1f} replayed/s)"
+
+
+class Redriver:
+    """Parallel receive -> filter -> replay -> delete loop."""
+
+    def __init__(
+        self,
+        sqs: Any,
+        queue_url: str,
+        matches: Callable[[dict[str, Any], dict[str, Any]], bool],
+        replayer: QueueReplayer | DispatchReplayer | None,
+        concurrency: int = 8,
+        wait_seconds: int = MAX_WAIT_SECONDS,
+        visibility_timeout: int = 300,
+        max_messages: int | None = None,
+    ):
+        self.sqs = sqs
+        self.queue_url = queue_url
+        self.matches = matches
+        self.replayer = replayer
+        self.concurrency = concurrency
+        self.wait_seconds = wait_seconds
+        self.visibility_timeout = visibility_timeout
+        self.max_messages = max_messages
+        self.stats = RedriveStats()
+
+        # Messages left in the DLQ (MessageId -> latest receipt handle); hidden until the run ends
+        # so pollers do not receive them twice
+        self._kept: dict[str, str] = {}
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+
+    def run(self) -> RedriveStats:
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_hidden, args=(stop,), daemon=True)
+        heartbeat.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for future in [executor.submit(self._poll) for _ in range(self.concurrency)]:
+                    future.result()
+        finally:
+            stop.set()
+            heartbeat.join()
+            self._release_all()
+        return self.stats
+
+    def _poll(self) -> None:
+        while self.max_messages is None or self.stats.counts["received"] < self.max_messages:
+            response = self.sqs.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=MAX_BATCH_SIZE,
+                WaitTimeSeconds=self.wait_seconds,
+                VisibilityTimeout=self.visibility_timeout,
+                AttributeNames=["All"],
+                MessageAttributeNames=["All"],
+            )
+            messages = self._first_seen(response.get("Messages", []))
+            if not messages:
+                # Long poll came back empty (or with messages this run already handled): the queue is drained
+                return
+            self._process(messages)
+
+    def _first_seen(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Drop messages this run already handled; for kept ones, remember the new receipt handle."""
+        new = []
+        with self._lock:
+            for message in messages:
+                message_id = message["MessageId"]
+                if message_id not in self._seen:
+                    self._seen.add(message_id)
+                    new.append(message)
+                elif message_id in self._kept:
+                    self._kept[message_id] = message["ReceiptHandle"]
+        return new
+
+    def _process(self, messages: list[dict[str, Any]]) -> None:
+        matched, skipped, invalid = [], [], 0
+        for message in messages:
+            try:
+                body = json.loads(message["Body"])
+            except (TypeError, ValueError):
+                invalid += 1
+                skipped.append(message)
+                continue
+            (matched if self.matches(message, body) else skipped).append(message)
+
+        replayed = self.replayer.replay(matched) if self.replayer is not None and matched else []
+        deleted = self._delete(replayed)
+        deleted_ids = {m["MessageId"] for m in deleted}
+        with self._lock:
+            self._kept.update(
+                (m["MessageId"], m["ReceiptHandle"]) for m in messages if m["MessageId"] not in deleted_ids
+            )
+
+        received = self.stats.add(
+            received=len(messages),
+            matched=len(matched),
+            replayed=len(replayed),
+            deleted=len(deleted),
+            skipped=len(skipped),
+            failed=len(matched) - len(replayed) if self.replayer is not None else 0,
+            invalid=invalid,
+        )
+        if received // PROGRESS_EVERY != (received - len(messages)) // PROGRESS_EVERY:
+            print(f"Progress: {self.stats.report()}")
+
+    def _delete(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if not messages:
+            return []
+        by_id = {str(i): message for i, message in enumerate(messages)}
+        response = self.sqs.delete_message_batch(
+            QueueUrl=self.queue_url,
+            Entries=[{"Id": entry_id, "ReceiptHandle": m["ReceiptHandle"]} for entry_id, m in by_id.items()],
+        )
+        for failure in response.get("Failed", []):
+            print(f"Delete failed (message may be replayed twice): {failure}", file=sys.stderr)
+        return [by_id[item["Id"]] for item in response.get("Successful", [])]
+
+    def _keep_hidden(self, stop: threading.Event) -> None:
+        """Extend the visibility timeout of the kept messages until the run ends."""
+        interval = max(1.0, self.visibility_timeout / 2)
+        while not stop.wait(interval):
+            self._change_visibility(self.visibility_timeout)
+
+    def _release_all(self) -> None:
+        """Make the messages left in the DLQ visible again."""
+        self._change_visibility(0)
+
+    def _change_visibility(self, timeout: int) -> None:
+        with self._lock:
+            handles = list(self._kept.values())
+        for batch in _chunks(handles, MAX_BATCH_SIZE):
+            try:
+                response = self.sqs.change_message_visibility_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[
+                        {"Id": str(i), "ReceiptHandle": handle, "VisibilityTimeout": timeout}
+                        for i, handle in enumerate(batch)
+                    ],
+                )
+            except Exception as e:
+                print(f"ChangeMessageVisibilityBatch failed: {e}", file=sys.stderr)
+                continue
+            for failure in response.get("Failed", []):
+                print(f"Visibility change to {timeout}s failed: {failure}", file=sys.stderr)
+
+
+def _chunks(items: list[Any], size: int) -> Iterator[list[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and replay messages from the updates DLQ.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--queue-url", help="DLQ URL (e.g. the tg-dev-updates-dlq queue)")
+    source.add_argument("--local-file", type=Path, help="Run against an in-memory SQS loaded from a JSON lines file")
+    parser.add_argument("--region", help="AWS region (defaults to the boto3 configuration)")
+    parser.add_argument("--mode", choices=("queue", "dispatch"), default="queue", help="How to replay messages")
+    parser.add_argument("--target-queue-url", help="Replay into this queue instead of each message's source queue")
+    parser.add_argument("--update-type", nargs="*", help="Only updates of these types (message, callback_query, ...)")
+    parser.add_argument("--command", nargs="*", help="Only messages with these commands (e.g. /start)")
+    parser.add_argument("--error", help="Only messages whose ErrorMessage/ErrorCode attribute contains this text")
+    parser.add_argument("--dry-run", action="store_true", help="Count matches, replay and delete nothing")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel ReceiveMessage pollers")
+    parser.add_argument("--wait-seconds", type=int, default=MAX_WAIT_SECONDS, help="Long-poll wait (0-20)")
+    parser.add_argument("--visibility-timeout", type=int, default=300, help="Seconds messages stay hidden (renewed)")
+    parser.add_argument("--max-messages", type=int, help="Stop after receiving about this many messages")
+    args = parser.parse_args()
+
+    if args.local_file:
+        sqs: Any = InMemorySQS()
+        queue_url = "local://dlq"
+        print(f"Loaded {sqs.load(queue_url, args.local_file)} messages into the in-memory DLQ")
+    else:
+        import boto3  # Only needed against real SQS
+
+        sqs = boto3.client("sqs", region_name=args.region)
+        queue_url = args.queue_url
+
+    replayer: QueueReplayer | DispatchReplayer | None = None
+    if not args.dry_run:
+        replayer = DispatchReplayer() if args.mode == "dispatch" else QueueReplayer(sqs, args.target_queue_url)
+
+    redriver = Redriver(
+        sqs,
+        queue_url,
+        build_filter(args),
+        replayer,
+        concurrency=args.concurrency,
+        wait_seconds=min(MAX_WAIT_SECONDS, max(0, args.wait_seconds)),
+        visibility_timeout=args.visibility_timeout,
+        max_messages=args.max_messages,
+    )
+    stats = redriver.run()
+
+    print(f"{'Dry run' if args.dry_run else 'Redrive'} finished: {stats.report()}")
+    if isinstance(sqs, InMemorySQS):
+        for url, messages in sqs.queues.items():
+            print(f"  {url}: {len(messages)} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@
 # ./scripts/setup_webhook.sh [dev|prod] [bot_token] [webhook_url]
 
 # NOTE: webhook_url should be the API Gateway URL with the /webhook path
+# (/webhook/<bot_id> for bots configured in TELEGRAM_BOTS; put the generated
+# secret token in that bot's "secret_token")
 
 ENV=$1
 BOT_TOKEN=$2
@@ -27,7 +29,7 @@ RESPONSE=$(curl -s -X POST "https://api.telegram.org/bot$BOT_TOKEN/setWebhook" \
      -d "url=$WEBHOOK_URL" \
      -d "secret_token=$SECRET_TOKEN" \
      -d "drop_pending_updates=true" \
-     -d 'allowed_updates=["message","callback_query"]')
+     -d 'allowed_updates=["message","callback_query","inline_query","chat_member","my_chat_member"]')
 
 echo "📡 Webhook response:"
 echo "$RESPONSE" | jq '.' 2>/dev/null || echo "$RESPONSE"
@@ -1,26 +1,48 @@
 """Receiver Lambda: HTTP API entrypoint for Telegram webhook."""
 
+import time
 from typing import Any
 
-from aws_lambda_powertools import Logger
+from aws_lambda_powertools import Logger, Metrics
+from repositories import RATE_LIMIT_TABLE_NAME
+from repositories.rate_limit_repo import RateLimitRepository
 from repositories.sqs_repo import SQSClient
+from services import (
+    RATE_LIMIT_ACTION,
+    RATE_LIMIT_DEFER_SECONDS,
+    RATE_LIMIT_MAX_UPDATES,
+    RATE_LIMIT_WINDOW_SECONDS,
+)
 from services.api_gateway_utils import (
     create_response,
+    get_bot_id,
     parse_api_gateway_event,
     verify_webhook_secret_token,
 )
+from services.rate_limiter import SlidingWindowRateLimiter
+from services.update_utils import LANE_INLINE, classify_update, extract_user_id
 
 logger = Logger()
+metrics = Metrics()
 
 # Initialize SQS client globally to reuse TCP connections across Lambda invocations
 sqs_client = SQSClient()
 
+# Rate limiter state lives as long as the container (in-process window + optional shared counter)
+rate_limiter = SlidingWindowRateLimiter(
+    max_updates=RATE_LIMIT_MAX_UPDATES,
+    window_seconds=RATE_LIMIT_WINDOW_SECONDS,
+    shared_repo=RateLimitRepository() if RATE_LIMIT_TABLE_NAME else None,
+)
+
 
+@metrics.log_metrics
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     Handle incoming Telegram webhook requests.
 
-    Validates the secret token, then pushes the message to SQS for async processing.
+    Validates the secret token of the bot the webhook belongs to (/webhook/{bot_id}),
+    then pushes the message to SQS for async processing.
     Returns 200 OK immediately to Telegram to prevent retries.
 
     Args:
@@ -30,10 +52,13 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     Returns:
         API Gateway HTTP API response
     """
+    # Webhook arrival time, carried to the worker for end-to-end lag tracking
+    received_at = int(time.time() * 1000)
     logger.info("Received new webhook event")
     try:
-        # Verify webhook secret token (security check)
-        if not verify_webhook_secret_token(event):
+        # Verify the bot's webhook secret token (security check)
+        bot_id = get_bot_id(event)
+        if not verify_webhook_secret_token(event, bot_id):
             return create_response(200, {"ok": False, "error": "Unauthorized"})
 
         # Parse API Gateway event body
@@ -44,8 +69,25 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
             logger.error("Failed to parse API Gateway event", extra={"error": e})
             return create_response(200, {"message": "Invalid request"})
 
-        # Send event body to SQS
-        sqs_client.send_telegram_update(body)
+        # Flood protection: drop or defer updates from users over the limit
+        # (counted per user across all bots, which share the same worker concurrency).
+        # Inline queries are exempt: they arrive per keystroke, the worker drops superseded ones,
+        # and a deferred answer would be too late for Telegram anyway.
+        lane = classify_update(body)
+        delay_seconds = 0
+        if lane != LANE_INLINE and not rate_limiter.allow(extract_user_id(body)):
+            if RATE_LIMIT_ACTION == "drop":
+                return create_response(200, {"message": "Rate limited"})
+            delay_seconds = RATE_LIMIT_DEFER_SECONDS
+
+        # Send event body to its priority lane queue, tagged with the bot it belongs to
+        sqs_client.send_telegram_update(
+            body,
+            lane=lane,
+            delay_seconds=delay_seconds,
+            bot_id=bot_id,
+            received_at=received_at,
+        )
 
     except Exception as e:
         logger.exception("Unexpected error in handler", extra={"error": e})
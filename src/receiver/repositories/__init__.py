@@ -4,3 +4,14 @@ QUEUE_URL = os.environ.get("QUEUE_URL")
 
 if not QUEUE_URL:
     raise ValueError("QUEUE_URL must be set")
+
+# Priority lane queues; lanes without a dedicated queue fall back to QUEUE_URL
+LANE_QUEUE_URLS = {
+    "commands": os.environ.get("COMMANDS_QUEUE_URL") or QUEUE_URL,
+    "callbacks": os.environ.get("CALLBACKS_QUEUE_URL") or QUEUE_URL,
+    "inline": os.environ.get("INLINE_QUEUE_URL") or QUEUE_URL,
+    "default": QUEUE_URL,
+}
+
+# Optional: shared per-user rate limit counters (in-process limiting only when unset)
+RATE_LIMIT_TABLE_NAME = os.environ.get("RATE_LIMIT_TABLE_NAME")
@@ -0,0 +1,23 @@
+"""
+Shared boto3 clients with tuned botocore settings.
+
+One DynamoDB resource and one SQS client per container: every repository shares their
+connection pools, so a connection opened once (e.g. by the init-phase prewarm) serves all tables.
+"""
+
+import boto3
+from botocore.config import Config
+
+BOTO_CONFIG = Config(
+    # Enough pooled connections for the handler thread pool plus the main thread
+    max_pool_connections=16,
+    # Keep idle connections alive between warm invocations
+    tcp_keepalive=True,
+    # Fail fast inside a Lambda budget; "standard" retries throttling/transient errors with backoff
+    connect_timeout=2,
+    read_timeout=5,
+    retries={"mode": "standard", "max_attempts": 3},
+)
+
+dynamodb = boto3.resource("dynamodb", config=BOTO_CONFIG)
+sqs_client = boto3.client("sqs", config=BOTO_CONFIG)
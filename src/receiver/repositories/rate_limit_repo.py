@@ -0,0 +1,58 @@
+"""
+Shared per-user update counter in DynamoDB.
+
+Implements the sliding-window-counter approximation: one counter per fixed window, and the
+estimate is `previous * (1 - elapsed fraction) + current`. Both windows live as attributes of
+a single item per user, so a check is one UpdateItem round trip.
+"""
+
+import math
+import time
+
+from aws_lambda_powertools import Logger
+from repositories import RATE_LIMIT_TABLE_NAME
+from repositories.aws_clients import dynamodb
+
+logger = Logger()
+
+
+class RateLimitRepository:
+    """DynamoDB-backed sliding window counter keyed by user_id."""
+
+    def __init__(self, table_name: str = RATE_LIMIT_TABLE_NAME):
+        self._table = dynamodb.Table(table_name)
+        logger.debug(f"RateLimitRepository initialized with table: {table_name}")
+
+    def hit(self, user_id: int, max_updates: int, window_seconds: float) -> bool:
+        """
+        Count one update for user_id and return whether the user is still within the limit.
+
+        Raises:
+            ClientError: If the DynamoDB update fails
+        """
+        now = time.time()
+        window = int(now // window_seconds)
+        elapsed_fraction = (now % window_seconds) / window_seconds
+
+        current_attr = f"w{window}"
+        previous_attr = f"w{window - 1}"
+        stale_attr = f"w{window - 2}"
+
+        response = self._table.update_item(
+            Key={"user_id": user_id},
+            UpdateExpression="SET expires_at = :expires_at ADD #current :one REMOVE #stale",
+            ExpressionAttributeNames={"#current": current_attr, "#stale": stale_attr},
+            ExpressionAttributeValues={
+                ":one": 1,
+                # Item disappears (via DynamoDB TTL) once both windows are over
+                ":expires_at": int(now + 2 * math.ceil(window_seconds)),
+            },
+            ReturnValues="ALL_NEW",
+        )
+
+        attributes = response.get("Attributes", {})
+        current = int(attributes.get(current_attr, 0))
+        previous = int(attributes.get(previous_attr, 0))
+        estimate = previous * (1 - elapsed_fraction) + current
+
+        return estimate <= max_updates
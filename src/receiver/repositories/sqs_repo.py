@@ -3,14 +3,14 @@
 import json
 from typing import Any
 
-import boto3
 from aws_lambda_powertools import Logger
-from repositories import QUEUE_URL
+from repositories import LANE_QUEUE_URLS, QUEUE_URL
+from repositories.aws_clients import sqs_client
 
 logger = Logger()
 
 # Initialize SQS client globally to reuse TCP connections across Lambda invocations
-_SQS_CLIENT = boto3.client("sqs")
+_SQS_CLIENT = sqs_client
 
 
 class SQSClient:
@@ -19,31 +19,53 @@ class SQSClient:
     def __init__(self) -> None:
         """Initialize SQS client."""
         self.queue_url = QUEUE_URL
+        self.lane_queue_urls = LANE_QUEUE_URLS
         self.sqs_client = _SQS_CLIENT
 
-        logger.debug(f"SQS client initialized with queue URL: {self.queue_url}")
+        logger.debug(f"SQS client initialized with queue URLs: {self.lane_queue_urls}")
 
-    def send_telegram_update(self, update_payload: dict[str, Any]) -> None:
+    def send_telegram_update(
+        self,
+        update_payload: dict[str, Any],
+        lane: str = "default",
+        delay_seconds: int = 0,
+        bot_id: str | None = None,
+        received_at: int | None = None,
+    ) -> None:
         """
         Push the raw Telegram update to SQS for asynchronous processing.
 
         Args:
             update_payload: The full JSON body received from Telegram Webhook.
+            lane: Priority lane, selects the queue and is attached as the "lane" message attribute.
+            delay_seconds: Delay delivery to the worker (0-900 seconds), e.g. for rate-limited users.
+            bot_id: Bot the update was sent to, attached as the "bot_id" message attribute
+                (the worker treats messages without it as the default bot).
+            received_at: Epoch milliseconds the webhook request arrived, attached as the
+                "received_at" message attribute for end-to-end lag tracking.
 
         Raises:
             Exception: Propagates boto3 exceptions to be handled by the caller.
         """
         try:
+            message_attributes = {"lane": {"DataType": "String", "StringValue": lane}}
+            if bot_id:
+                message_attributes["bot_id"] = {"DataType": "String", "StringValue": bot_id}
+            if received_at:
+                message_attributes["received_at"] = {"DataType": "Number", "StringValue": str(received_at)}
+
             # We treat the payload as an opaque JSON object here.
             # No parsing, no logic. Just Move It.
             self.sqs_client.send_message(
-                QueueUrl=self.queue_url,
+                QueueUrl=self.lane_queue_urls.get(lane, self.queue_url),
                 MessageBody=json.dumps(update_payload),
+                DelaySeconds=delay_seconds,
+                MessageAttributes=message_attributes,
             )
 
             # Log only the update_id if possible, or just a success marker to save costs on large logs
             update_id = update_payload.get("update_id", "unknown")
-            logger.info(f"Successfully queued update_id: {update_id}")
+            logger.info(f"Successfully queued update_id: {update_id}", extra={"lane": lane, "bot_id": bot_id})
 
         except Exception as e:
             logger.error(f"Failed to send update to SQS: {str(e)}", exc_info=True)
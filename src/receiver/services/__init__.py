@@ -1,8 +1,28 @@
 """Receiver Lambda package."""
 
+import json
 import os
 
 WEBHOOK_SECRET_TOKEN = os.environ.get("WEBHOOK_SECRET_TOKEN")
 
 if not WEBHOOK_SECRET_TOKEN:
     raise ValueError("TELEGRAM_BOT_TOKEN and WEBHOOK_SECRET_TOKEN must be set")
+
+# Multi-bot tenancy: POST /webhook/{bot_id} is verified against that bot's secret token,
+# the legacy POST /webhook against WEBHOOK_SECRET_TOKEN (bot "default").
+# Parsed once per container: {"<bot_id>": "<secret_token>", ...}
+DEFAULT_BOT_ID = "default"
+BOT_SECRET_TOKENS: dict[str, str] = {
+    **json.loads(os.environ.get("BOT_SECRET_TOKENS") or "{}"),
+    DEFAULT_BOT_ID: WEBHOOK_SECRET_TOKEN,
+}
+
+# Per-user flood protection (RATE_LIMIT_MAX_UPDATES=0 disables it)
+RATE_LIMIT_MAX_UPDATES = int(os.environ.get("RATE_LIMIT_MAX_UPDATES", "20"))
+RATE_LIMIT_WINDOW_SECONDS = float(os.environ.get("RATE_LIMIT_WINDOW_SECONDS", "10"))
+# What happens to updates over the limit: "drop" them, or "defer" them via SQS DelaySeconds
+RATE_LIMIT_ACTION = os.environ.get("RATE_LIMIT_ACTION", "drop")
+RATE_LIMIT_DEFER_SECONDS = min(int(os.environ.get("RATE_LIMIT_DEFER_SECONDS", "30")), 900)
+
+if RATE_LIMIT_ACTION not in ("drop", "defer"):
+    raise ValueError("RATE_LIMIT_ACTION must be 'drop' or 'defer'")
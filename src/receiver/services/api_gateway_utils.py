@@ -4,18 +4,29 @@ import json
 from typing import Any
 
 from aws_lambda_powertools import Logger
-from services import WEBHOOK_SECRET_TOKEN
+from services import BOT_SECRET_TOKENS, DEFAULT_BOT_ID
 
 logger = Logger()
 
 
-def verify_webhook_secret_token(event: dict[str, Any]) -> bool:
+def get_bot_id(event: dict[str, Any]) -> str:
+    """Return the bot ID from the /webhook/{bot_id} path ("default" for the legacy /webhook route)."""
+    return (event.get("pathParameters") or {}).get("bot_id") or DEFAULT_BOT_ID
+
+
+def verify_webhook_secret_token(event: dict[str, Any], bot_id: str = DEFAULT_BOT_ID) -> bool:
     """
     Verify Telegram webhook secret token from X-Telegram-Bot-Api-Secret-Token header.
 
     Telegram sends a secret token with each webhook request to verify authenticity.
     This prevents spoofed requests from reaching the bot.
+    Every bot has its own secret token, so one bot's token cannot post updates for another.
     """
+    expected_token = BOT_SECRET_TOKENS.get(bot_id)
+    if expected_token is None:
+        logger.critical(f"Unknown bot_id: {bot_id}")
+        return False
+
     # Get headers from API Gateway event
     headers = event.get("headers", {})
     received_token = headers.get("x-telegram-bot-api-secret-token") or headers.get("X-Telegram-Bot-Api-Secret-Token")
@@ -25,8 +36,8 @@ def verify_webhook_secret_token(event: dict[str, Any]) -> bool:
         return False
 
     # Use constant-time comparison to prevent timing attacks
-    if not hmac.compare_digest(received_token, WEBHOOK_SECRET_TOKEN):
-        logger.critical("Webhook secret token mismatch")
+    if not hmac.compare_digest(received_token, expected_token):
+        logger.critical("Webhook secret token mismatch", extra={"bot_id": bot_id})
         return False
 
     logger.info("Webhook secret token verified successfully")
@@ -0,0 +1,107 @@
+"""
+Per-user flood protection.
+
+Updates are counted per user in a sliding window before they are enqueued, so a single
+spamming user cannot occupy the worker's limited concurrency.
+
+Two layers:
+- In-process sliding window (fast path, no network): catches bursts hitting a warm container.
+- Optional shared DynamoDB counter: sees traffic across all receiver containers.
+"""
+
+import time
+from collections import Counter, OrderedDict, deque
+
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from repositories.rate_limit_repo import RateLimitRepository
+
+logger = Logger()
+metrics = Metrics()
+
+
+class SlidingWindowRateLimiter:
+    """
+    Allows at most `max_updates` per user within `window_seconds`.
+
+    Args:
+        max_updates: Updates allowed per window (0 disables the limiter)
+        window_seconds: Sliding window length
+        shared_repo: Optional DynamoDB counter shared by all containers
+        max_tracked_users: In-process users kept before the least recently seen are evicted
+    """
+
+    def __init__(
+        self,
+        max_updates: int,
+        window_seconds: float,
+        shared_repo: RateLimitRepository | None = None,
+        max_tracked_users: int = 10_000,
+    ):
+        self.max_updates = max_updates
+        self.window_seconds = window_seconds
+        self.shared_repo = shared_repo
+        self.max_tracked_users = max_tracked_users
+
+        self._hits: OrderedDict[int, deque[float]] = OrderedDict()
+        self.drops: Counter[int] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_updates > 0
+
+    def allow(self, user_id: int | None) -> bool:
+        """
+        Record an update from user_id and return whether it is within the limit.
+
+        Updates without a sender are always allowed.
+        """
+        if not self.enabled or user_id is None:
+            return True
+
+        if not self._allow_local(user_id):
+            self._record_drop(user_id, source="local")
+            return False
+
+        if self.shared_repo is not None:
+            try:
+                allowed = self.shared_repo.hit(user_id, self.max_updates, self.window_seconds)
+            except Exception as e:
+                # Fail open: flood protection must never block legitimate traffic
+                logger.warning(f"Shared rate limit check failed for user {user_id}: {e}")
+                return True
+
+            if not allowed:
+                self._record_drop(user_id, source="shared")
+                return False
+
+        return True
+
+    def _allow_local(self, user_id: int) -> bool:
+        now = time.monotonic()
+        hits = self._hits.get(user_id)
+        if hits is None:
+            hits = self._hits[user_id] = deque()
+            if len(self._hits) > self.max_tracked_users:
+                self._hits.popitem(last=False)
+        else:
+            self._hits.move_to_end(user_id)
+
+        # Slide the window
+        while hits and now - hits[0] >= self.window_seconds:
+            hits.popleft()
+
+        if len(hits) >= self.max_updates:
+            return False
+
+        hits.append(now)
+        return True
+
+    def _record_drop(self, user_id: int, source: str) -> None:
+        self.drops[user_id] += 1
+        logger.warning(
+            "Update rate limited",
+            extra={"user_id": user_id, "source": source, "user_drops": self.drops[user_id]},
+        )
+        metrics.add_metric(name="RateLimitedUpdates", unit=MetricUnit.Count, value=1)
+        metrics.add_metadata(key="rate_limited_user_id", value=user_id)
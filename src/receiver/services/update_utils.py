@@ -0,0 +1,58 @@
+"""Helpers for inspecting raw Telegram updates without parsing them fully."""
+
+from typing import Any
+
+# Priority lanes: each is backed by its own SQS queue and worker event source
+LANE_COMMANDS = "commands"
+LANE_CALLBACKS = "callbacks"
+LANE_INLINE = "inline"
+LANE_DEFAULT = "default"
+
+# Update types whose payload carries the sender in a "from" field
+_USER_UPDATE_TYPES = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "shipping_query",
+    "pre_checkout_query",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+)
+
+
+def extract_user_id(update: dict[str, Any]) -> int | None:
+    """
+    Return the Telegram user ID that triggered an update, if any.
+
+    Channel posts and polls have no sender and return None.
+    """
+    for update_type in _USER_UPDATE_TYPES:
+        payload = update.get(update_type)
+        if payload:
+            return payload.get("from", {}).get("id")
+    return None
+
+
+def classify_update(update: dict[str, Any]) -> str:
+    """
+    Pick the priority lane for an update.
+
+    - callbacks: button presses, which users expect to respond instantly
+    - inline: inline queries, one per keystroke; batched so the worker can drop superseded ones
+    - commands: messages starting with "/"
+    - default: everything else (free text, media, edits, membership changes...)
+    """
+    if "callback_query" in update:
+        return LANE_CALLBACKS
+
+    if "inline_query" in update:
+        return LANE_INLINE
+
+    text = update.get("message", {}).get("text", "")
+    if text.startswith("/"):
+        return LANE_COMMANDS
+
+    return LANE_DEFAULT
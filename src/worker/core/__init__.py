@@ -1,3 +1,16 @@
 """
 Core package for the worker Lambda.
 """
+
+import os
+
+# Opt-in warm-container memory profiling (see core/profiler.py).
+# MEMORY_PROFILE_EVERY_N=0 disables it; otherwise a snapshot is diffed every N invocations.
+MEMORY_PROFILE_EVERY_N = int(os.environ.get("MEMORY_PROFILE_EVERY_N", "0"))
+# Fraction of containers that profile (0.0-1.0), so it can stay on in production
+MEMORY_PROFILE_SAMPLE_RATE = float(os.environ.get("MEMORY_PROFILE_SAMPLE_RATE", "1.0"))
+# Stack depth recorded per allocation: more frames = better attribution, more overhead
+MEMORY_PROFILE_FRAMES = int(os.environ.get("MEMORY_PROFILE_FRAMES", "1"))
+# Number of top-growing allocation sites / object types logged per snapshot (0 skips object counting)
+MEMORY_PROFILE_TOP_N = int(os.environ.get("MEMORY_PROFILE_TOP_N", "10"))
+MEMORY_PROFILE_OBJECT_TYPES = int(os.environ.get("MEMORY_PROFILE_OBJECT_TYPES", "10"))
@@ -0,0 +1,114 @@
+"""
+Multi-bot tenancy.
+
+One worker serves every bot of the deployment. The receiver tags each SQS message with a
+"bot_id" attribute; here the worker reads it back and looks up that bot's Dispatcher.
+A bot's TelegramClient, Scheduler and Dispatcher are built on its first update and then
+reused by the warm container, so an update costs no configuration loading. Clients of all
+bots share one HTTP session (and thus the keep-alive connections to the Bot API) and one
+file_id cache.
+"""
+
+import threading
+from typing import Any, Callable
+
+from aws_lambda_powertools import Logger
+from repositories import DEFAULT_BOT_ID
+from repositories.file_id_cache import FileIdCache
+from repositories.queue_client import UpdatesQueueClient
+from repositories.response_cache_repo import ResponseCacheRepository
+from repositories.scheduled_job_repository import ScheduledJobRepository
+from repositories.telegram_client import TelegramClient, new_session
+from repositories.user_repository import UserRepository
+
+from .dispatcher import Dispatcher
+from .scheduler import Scheduler
+
+logger = Logger()
+
+
+class UnknownBotError(KeyError):
+    """Raised for a bot ID that has no token configured."""
+
+
+def get_bot_id(record: dict[str, Any]) -> str:
+    """Return the bot an SQS record belongs to (messages without the attribute are the default bot's)."""
+    attribute = record.get("messageAttributes", {}).get("bot_id", {})
+    return attribute.get("stringValue") or DEFAULT_BOT_ID
+
+
+class BotRegistry:
+    """
+    Lazily built, container-wide Dispatcher per bot.
+
+    Args:
+        tokens: Bot ID -> bot token
+        setup: Registers the handlers on a new Dispatcher (e.g. services.handlers.register_handlers)
+        user_repo: Users table, shared by all bots (Telegram user IDs are global)
+        response_cache_repo: Shared response cache (keys are namespaced by bot ID)
+        job_repo: Scheduled jobs table; scheduling is enabled when both job_repo and queue are set
+        queue: Updates queue for scheduled jobs
+    """
+
+    def __init__(
+        self,
+        tokens: dict[str, str],
+        setup: Callable[[Dispatcher], None],
+        user_repo: UserRepository,
+        response_cache_repo: ResponseCacheRepository | None = None,
+        job_repo: ScheduledJobRepository | None = None,
+        queue: UpdatesQueueClient | None = None,
+    ):
+        self._tokens = tokens
+        self._setup = setup
+        self.user_repo = user_repo
+        self.response_cache_repo = response_cache_repo
+        self.job_repo = job_repo
+        self.queue = queue
+
+        # Shared by every bot's client
+        self.session = new_session()
+        self.file_id_cache = FileIdCache()
+
+        self._dispatchers: dict[str, Dispatcher] = {}
+        self._lock = threading.Lock()
+        self._context: Any = None
+
+    def get(self, bot_id: str) -> Dispatcher:
+        """
+        Return the Dispatcher of a bot, building it on first use.
+
+        Raises:
+            UnknownBotError: If no token is configured for bot_id
+        """
+        dispatcher = self._dispatchers.get(bot_id)
+        if dispatcher is not None:
+            return dispatcher
+
+        with self._lock:
+            dispatcher = self._dispatchers.get(bot_id)
+            if dispatcher is None:
+                dispatcher = self._dispatchers[bot_id] = self._build(bot_id)
+        return dispatcher
+
+    def set_deadline(self, context: Any) -> None:
+        """Bind the current invocation's deadline to every bot's client (including ones built later)."""
+        self._context = context
+        for dispatcher in list(self._dispatchers.values()):
+            dispatcher.bot.set_deadline(context)
+
+    def _build(self, bot_id: str) -> Dispatcher:
+        token = self._tokens.get(bot_id)
+        if not token:
+            raise UnknownBotError(bot_id)
+
+        bot = TelegramClient(self.file_id_cache, bot_token=token, bot_id=bot_id, session=self.session)
+        bot.set_deadline(self._context)
+        scheduler = (
+            Scheduler(bot, self.job_repo, self.queue) if self.job_repo is not None and self.queue is not None else None
+        )
+        dispatcher = Dispatcher(bot, self.user_repo, response_cache_repo=self.response_cache_repo, scheduler=scheduler)
+        self._setup(dispatcher)
+
+        logger.info("Bot initialized", extra={"bot_id": bot_id, "bots": len(self._dispatchers) + 1})
+        return dispatcher
@@ -0,0 +1,93 @@
+"""
+TTL cache for chat member and administrator lookups.
+
+Moderation bots check membership/admin status on nearly every message. Lookups are served
+from the container's cache while fresh, and the Dispatcher keeps it correct by updating it
+from `chat_member` / `my_chat_member` updates as soon as a status changes.
+"""
+
+from typing import Any
+
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from repositories.telegram_client import TelegramClient
+
+from .cache import TTLCache
+
+logger = Logger()
+metrics = Metrics()
+
+ADMIN_STATUSES = ("creator", "administrator")
+
+
+class ChatMemberCache:
+    """
+    Cached getChatMember / getChatAdministrators.
+
+    Args:
+        bot: Telegram client used on cache misses
+        ttl: Seconds an entry stays fresh
+        max_entries: Entries kept per cache before LRU eviction
+    """
+
+    def __init__(self, bot: TelegramClient, ttl: float = 300, max_entries: int = 4096):
+        self.bot = bot
+        self._members = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._admins = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get_member(self, chat_id: int, user_id: int) -> dict[str, Any]:
+        """Return the ChatMember of user_id in chat_id."""
+        key = (chat_id, user_id)
+        member = self._members.get(key)
+        self._record("member", member is not None)
+        if member is None:
+            member = self.bot.get_chat_member(chat_id, user_id)
+            self._members.set(key, member)
+        return member
+
+    def get_administrators(self, chat_id: int) -> list[dict[str, Any]]:
+        """Return the administrators (ChatMember list) of chat_id."""
+        admins = self._admins.get(chat_id)
+        self._record("admins", admins is not None)
+        if admins is None:
+            admins = self.bot.get_chat_administrators(chat_id)
+            self._admins.set(chat_id, admins)
+        return admins
+
+    def is_admin(self, chat_id: int, user_id: int) -> bool:
+        """Whether user_id is the creator or an administrator of chat_id."""
+        # A fresh member entry answers directly (it is updated from chat_member updates)
+        member = self._members.get((chat_id, user_id))
+        if member is not None:
+            self._record("member", True)
+            return member.get("status") in ADMIN_STATUSES
+
+        return any(admin.get("user", {}).get("id") == user_id for admin in self.get_administrators(chat_id))
+
+    def apply_update(self, chat_member_update: dict[str, Any]) -> None:
+        """
+        Refresh the cache from a `chat_member` / `my_chat_member` update.
+
+        The new member state replaces the cached one and the chat's admin list is
+        dropped, since the change may have promoted or demoted someone.
+        """
+        chat_id = chat_member_update.get("chat", {}).get("id")
+        new_member = chat_member_update.get("new_chat_member") or {}
+        user_id = new_member.get("user", {}).get("id")
+        if chat_id is None:
+            return
+
+        self._admins.delete(chat_id)
+        if user_id is not None:
+            self._members.set((chat_id, user_id), new_member)
+
+        logger.debug("Chat member cache refreshed", extra={"chat_id": chat_id, "user_id": user_id})
+
+    @staticmethod
+    def _record(kind: str, hit: bool) -> None:
+        metrics.add_metric(
+            name="ChatMemberCacheHit" if hit else "ChatMemberCacheMiss",
+            unit=MetricUnit.Count,
+            value=1,
+        )
+        logger.debug(f"Chat member cache {'hit' if hit else 'miss'}", extra={"kind": kind})
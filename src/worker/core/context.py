@@ -2,11 +2,18 @@
 Execution Context for a single Telegram Update.
 """
 
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 from repositories.telegram_client import TelegramClient
 from repositories.user_repository import UserRepository
 
+from . import event_loop
+from .chat_members import ChatMemberCache
+from .inline import InlineResultCache
+from .scheduler import Scheduler
+from .streaming import ReplyStream
+
 
 class Context:
     """
@@ -14,15 +21,32 @@ class Context:
     This is the main object passed to command handlers.
     """
 
-    def __init__(self, update: dict[str, Any], bot: TelegramClient, user_repo: UserRepository):
+    def __init__(
+        self,
+        update: dict[str, Any],
+        bot: TelegramClient,
+        user_repo: UserRepository,
+        scheduler: Scheduler | None = None,
+        chat_members: ChatMemberCache | None = None,
+        inline_results: InlineResultCache | None = None,
+    ):
         self._update = update
         self._bot = bot
+        # Bot (tenant) this update was sent to
+        self.bot_id = bot.bot_id
         self._user_repo = user_repo
+        self._scheduler = scheduler
+        self._chat_members = chat_members
+        self._inline_results = inline_results
 
         # Extract common fields for easy access
         self.message = update.get("message", {})
-        self.chat_id = self.message.get("chat", {}).get("id")
-        self.user_data = self.message.get("from", {})
+        # Membership changes ("chat_member" / "my_chat_member" updates)
+        self.chat_member_update = update.get("chat_member") or update.get("my_chat_member") or {}
+        # Inline mode ("@my_bot query" typed in any chat)
+        self.inline_query = update.get("inline_query", {})
+        self.chat_id = (self.message or self.chat_member_update).get("chat", {}).get("id")
+        self.user_data = (self.message or self.chat_member_update or self.inline_query).get("from", {})
 
         # Handle text safely (some messages might be photos/files)
         self.text = self.message.get("text", "").strip()
@@ -34,6 +58,16 @@ class Context:
             if len(parts) > 1:
                 self.args = parts[1:]
 
+        # Replies sent while recording (see record_replies), used by response caching
+        self._recorded_replies: list[str] | None = None
+
+    @property
+    def command(self) -> str | None:
+        """Return the command without bot mention: "/start@my_bot x" -> "/start"."""
+        if not self.text.startswith("/"):
+            return None
+        return self.text.split()[0].split("@")[0]
+
     @property
     def user_id(self) -> int | None:
         """Return the user's telegram ID."""
@@ -56,6 +90,16 @@ class Context:
     def message_id(self) -> int | None:
         return self.message.get("message_id")
 
+    @property
+    def query(self) -> str:
+        """Text of an inline query ("" for other updates)."""
+        return self.inline_query.get("query", "")
+
+    @property
+    def offset(self) -> str:
+        """Paging offset of an inline query: "" for the first page, then the previous answer's next_offset."""
+        return self.inline_query.get("offset", "")
+
     def reply(self, text: str) -> None:
         """
         Shorthand to reply to the current message.
@@ -63,3 +107,127 @@ class Context:
         """
         if self.chat_id:
             self._bot.send_message(self.chat_id, text)
+            if self._recorded_replies is not None:
+                self._recorded_replies.append(text)
+
+    @contextmanager
+    def record_replies(self) -> Iterator[list[str]]:
+        """Collect the texts sent with reply() inside the block."""
+        self._recorded_replies = recorded = []
+        try:
+            yield recorded
+        finally:
+            self._recorded_replies = None
+
+    async def reply_async(self, text: str) -> None:
+        """
+        Async version of reply() for `async def` handlers.
+        Example: await asyncio.gather(ctx.reply_async("a"), ctx.reply_async("b"))
+        """
+        await event_loop.run_blocking(self.reply, text)
+
+    async def run_blocking(self, func: Any, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run blocking I/O (requests, boto3, ...) in the shared thread pool so several calls
+        can overlap in an `async def` handler.
+        Example:
+            weather, rates = await asyncio.gather(
+                ctx.run_blocking(requests.get, WEATHER_URL, timeout=5),
+                ctx.run_blocking(requests.get, RATES_URL, timeout=5),
+            )
+        """
+        return await event_loop.run_blocking(func, *args, **kwargs)
+
+    def get_chat_member(self, user_id: int | None = None) -> dict[str, Any]:
+        """
+        Return the ChatMember of a user (default: the sender) in this chat.
+        Served from a TTL cache while fresh.
+        """
+        return self._require_chat_members().get_member(self.chat_id, user_id or self.user_id)
+
+    def is_admin(self, user_id: int | None = None) -> bool:
+        """
+        Whether a user (default: the sender) is an admin of this chat.
+        Costs no network call while the cached admin list is fresh.
+        Example:
+            if not ctx.is_admin():
+                return ctx.reply("Admins only.")
+        """
+        return self._require_chat_members().is_admin(self.chat_id, user_id or self.user_id)
+
+    def _require_chat_members(self) -> ChatMemberCache:
+        if self._chat_members is None:
+            raise RuntimeError("Chat member lookups are not configured (Context created without chat_members)")
+        return self._chat_members
+
+    def schedule(self, delay: float, text: str) -> str:
+        """
+        Send `text` to this chat after `delay` seconds (reminders, delayed follow-ups).
+        Example: ctx.schedule(3600, "⏰ Time to stretch!")
+
+        Returns:
+            The scheduled job ID.
+        """
+        if self._scheduler is None:
+            raise RuntimeError("Scheduling is not configured (QUEUE_URL / TG_SCHEDULED_JOBS_TABLE_NAME)")
+        return self._scheduler.schedule(self.chat_id, delay, text)
+
+    def stream_reply(
+        self, placeholder: str = "⏳", min_interval: float | None = None, parse_mode: str | None = None
+    ) -> ReplyStream:
+        """
+        Reply progressively: send a placeholder now, then edit it as content arrives.
+        Edits are throttled to Telegram's limits (1s in private chats, 3s in groups).
+        Use it as a context manager (or call close()), or the last edit is never sent.
+        Raises ValueError for updates without a chat (inline queries).
+        Example:
+            with ctx.stream_reply() as stream:
+                for chunk in llm_answer():
+                    stream.write(chunk)
+        """
+        return ReplyStream(self._bot, self.chat_id, placeholder, min_interval=min_interval, parse_mode=parse_mode)
+
+    def answer_inline_query(
+        self,
+        results: list[dict[str, Any]],
+        cache_time: int = 300,
+        next_offset: str | None = None,
+        is_personal: bool = False,
+    ) -> bool:
+        """
+        Answer the current inline query (at most 50 results per page).
+        Unless `is_personal`, the answer is also cached server-side for `cache_time` seconds and
+        reused for the same query (ignoring case and extra spaces), language and offset.
+        Example:
+            page = int(ctx.offset or 0)
+            ctx.answer_inline_query(results[page : page + 20], next_offset=str(page + 20))
+
+        Returns:
+            False if the query expired before it could be answered.
+        """
+        answer = {
+            "results": results,
+            "cache_time": cache_time,
+            "is_personal": is_personal,
+            "next_offset": next_offset,
+        }
+        accepted = self._bot.answer_inline_query(self.inline_query["id"], **answer)
+        if accepted and self._inline_results is not None:
+            self._inline_results.put(self.query, self.lang_code, self.offset, answer)
+        return accepted
+
+    def reply_photo(self, photo: Any, caption: str | None = None) -> None:
+        """
+        Reply with a photo (path, binary stream, file_id or URL).
+        Example: ctx.reply_photo("assets/logo.png", caption="Our logo")
+        """
+        if self.chat_id:
+            self._bot.send_photo(self.chat_id, photo, caption=caption)
+
+    def reply_document(self, document: Any, caption: str | None = None) -> None:
+        """
+        Reply with a document (path, binary stream, file_id or URL).
+        Example: ctx.reply_document("/tmp/report.pdf")
+        """
+        if self.chat_id:
+            self._bot.send_document(self.chat_id, document, caption=caption)
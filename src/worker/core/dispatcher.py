@@ -3,20 +3,30 @@ Event Dispatcher.
 Handles routing of updates to registered functions using decorators.
 """
 
-from typing import Any, Callable
+import functools
+import inspect
+from typing import Any, Awaitable, Callable
 
-from aws_lambda_powertools import Logger
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from repositories.response_cache_repo import ResponseCacheRepository
 from repositories.telegram_client import TelegramClient
 from repositories.user_repository import UserRepository
 
 from worker.services.message_formatter import get_translated_text
 
+from . import event_loop
+from .cache import TTLCache
+from .chat_members import ChatMemberCache
 from .context import Context
+from .inline import InlineQueryTracker, InlineResultCache
+from .scheduler import JOB_KEY, Scheduler
 
 logger = Logger()
+metrics = Metrics()
 
-# Type alias for handler functions
-HandlerFunc = Callable[[Context], None]
+# Type alias for handler functions (plain `def` or `async def`)
+HandlerFunc = Callable[[Context], None | Awaitable[None]]
 
 
 class Dispatcher:
@@ -25,13 +35,27 @@ class Dispatcher:
     Handles routing of updates to registered functions using decorators.
     """
 
-    def __init__(self, bot: TelegramClient, user_repo: UserRepository):
+    def __init__(
+        self,
+        bot: TelegramClient,
+        user_repo: UserRepository,
+        response_cache_repo: ResponseCacheRepository | None = None,
+        scheduler: Scheduler | None = None,
+    ):
         self.bot = bot
+        self.bot_id = bot.bot_id
         self.user_repo = user_repo
+        self.response_cache_repo = response_cache_repo
+        self.scheduler = scheduler
+        self.chat_members = ChatMemberCache(bot)
+        self.inline_queries = InlineQueryTracker()
+        self.inline_results = InlineResultCache()
 
         # Registry for handlers
         self.command_handlers: dict[str, HandlerFunc] = {}
         self.default_handler: HandlerFunc | None = None
+        self.chat_member_handler: HandlerFunc | None = None
+        self.inline_query_handler: HandlerFunc | None = None
 
     def command(self, command_name: str):
         """
@@ -39,6 +63,9 @@ class Dispatcher:
         Usage:
             @dp.command("start")
             def handle_start(ctx): ...
+
+            @dp.command("news")
+            async def handle_news(ctx): ...
         """
 
         def decorator(func: HandlerFunc):
@@ -50,16 +77,147 @@ class Dispatcher:
 
         return decorator
 
+    def cached(self, ttl: float = 300, max_entries: int = 256, shared: bool = False):
+        """
+        Decorator to memoize a handler's replies per (command, args, language).
+        On a hit the handler body is skipped and the cached texts are sent straight away.
+        Only texts sent with ctx.reply() are cached, so use it for handlers that just reply.
+        Usage:
+            @dp.command("help")
+            @dp.cached(ttl=3600)
+            def handle_help(ctx): ...
+
+        Args:
+            ttl: Seconds a cached response stays valid
+            max_entries: In-process LRU size
+            shared: Also share entries between containers via DynamoDB (if configured)
+        """
+
+        def decorator(func: HandlerFunc):
+            cache = TTLCache(max_entries=max_entries, ttl=ttl)
+            shared_repo = self.response_cache_repo if shared else None
+
+            def lookup(ctx: Context) -> tuple[tuple[Any, ...], list[str] | None]:
+                # Non-command (default handler) responses are keyed by the full text
+                key = (ctx.command or ctx.text, tuple(ctx.args), ctx.lang_code)
+                replies = cache.get(key)
+                if replies is None and shared_repo is not None:
+                    replies = shared_repo.get(_shared_cache_key(self.bot_id, func, key))
+                    if replies is not None:
+                        cache.set(key, replies)
+
+                metrics.add_metric(
+                    name="ResponseCacheHit" if replies is not None else "ResponseCacheMiss",
+                    unit=MetricUnit.Count,
+                    value=1,
+                )
+                return key, replies
+
+            def store(key: tuple[Any, ...], replies: list[str]) -> None:
+                # Nothing was replied (or the handler sent media): nothing safe to replay
+                if not replies:
+                    return
+                cache.set(key, list(replies))
+                if shared_repo is not None:
+                    shared_repo.put(_shared_cache_key(self.bot_id, func, key), list(replies), ttl)
+
+            def replay(ctx: Context, replies: list[str]) -> None:
+                logger.info(f"Serving cached response for {func.__name__}")
+                for text in replies:
+                    ctx.reply(text)
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(ctx: Context) -> None:
+                    key, replies = lookup(ctx)
+                    if replies is not None:
+                        replay(ctx, replies)
+                        return
+                    with ctx.record_replies() as recorded:
+                        await func(ctx)
+                    store(key, recorded)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(ctx: Context) -> None:
+                key, replies = lookup(ctx)
+                if replies is not None:
+                    replay(ctx, replies)
+                    return
+                with ctx.record_replies() as recorded:
+                    func(ctx)
+                store(key, recorded)
+
+            return wrapper
+
+        return decorator
+
     def handle_default(self, func: HandlerFunc):
         """Decorator for the fallback handler (catch-all)."""
         self.default_handler = func
         return func
 
+    def handle_chat_member(self, func: HandlerFunc):
+        """Decorator for `chat_member` / `my_chat_member` updates (joins, leaves, promotions)."""
+        self.chat_member_handler = func
+        return func
+
+    def handle_inline_query(self, func: HandlerFunc):
+        """
+        Decorator for inline queries ("@my_bot query" typed in any chat).
+        Answers are cached server-side, so the handler only runs for new (query, language, offset) keys.
+        Usage:
+            @dp.handle_inline_query
+            def handle_search(ctx):
+                ctx.answer_inline_query(search(ctx.query), cache_time=60)
+        """
+        self.inline_query_handler = func
+        return func
+
+    @staticmethod
+    def _run_handler(handler: HandlerFunc, ctx: Context) -> None:
+        """Call a handler; async handlers run on the container's persistent event loop."""
+        result = handler(ctx)
+        if inspect.isawaitable(result):
+            event_loop.run(result)
+
     def process_update(self, update: dict[str, Any]):
         """
         Main entry point to process a single Telegram update.
         """
-        ctx = Context(update, self.bot, self.user_repo)
+        # Scheduled jobs come back through the queue and bypass routing
+        if JOB_KEY in update:
+            if self.scheduler is None:
+                logger.error("Received scheduled job but scheduling is not configured")
+                return
+            self.scheduler.run_job(update[JOB_KEY])
+            return
+
+        ctx = Context(
+            update,
+            self.bot,
+            self.user_repo,
+            scheduler=self.scheduler,
+            chat_members=self.chat_members,
+            inline_results=self.inline_results,
+        )
+
+        # --- Inline queries: skip superseded ones, serve repeated ones from the cache ---
+        if ctx.inline_query:
+            self._process_inline_query(ctx, update)
+            return
+
+        # --- Membership changes: keep the member/admin cache fresh ---
+        if ctx.chat_member_update:
+            self.chat_members.apply_update(ctx.chat_member_update)
+            if self.chat_member_handler:
+                try:
+                    self._run_handler(self.chat_member_handler, ctx)
+                except Exception as e:
+                    logger.exception(f"Error in chat member handler: {e}")
+            return
 
         # --- Middleware: Auto-User Tracking ---
         # Developers don't need to manually save users anymore!
@@ -81,7 +239,7 @@ class Dispatcher:
                 handler = self.command_handlers[command_key]
                 logger.info(f"Dispatching to command handler: {command_key}")
                 try:
-                    handler(ctx)
+                    self._run_handler(handler, ctx)
                 except Exception as e:
                     logger.exception(f"Error in command handler {command_key}: {e}")
                     ctx.reply(get_translated_text("error_occurred", lang_code=ctx.lang_code))
@@ -91,6 +249,37 @@ class Dispatcher:
         if self.default_handler:
             logger.info("Dispatching to default handler")
             try:
-                self.default_handler(ctx)
+                self._run_handler(self.default_handler, ctx)
             except Exception as e:
                 logger.exception(f"Error in default handler: {e}")
+
+    def _process_inline_query(self, ctx: Context, update: dict[str, Any]) -> None:
+        """Answer an inline query unless a newer one from the same user already arrived."""
+        if self.inline_query_handler is None:
+            return
+
+        self.inline_queries.observe(update)
+        if self.inline_queries.is_stale(update):
+            logger.debug("Dropping superseded inline query", extra={"update_id": update.get("update_id")})
+            metrics.add_metric(name="InlineQueriesDropped", unit=MetricUnit.Count, value=1)
+            return
+
+        cached = self.inline_results.get(ctx.query, ctx.lang_code, ctx.offset)
+        metrics.add_metric(
+            name="InlineQueryCacheHit" if cached is not None else "InlineQueryCacheMiss",
+            unit=MetricUnit.Count,
+            value=1,
+        )
+        try:
+            if cached is not None:
+                self.bot.answer_inline_query(ctx.inline_query["id"], **cached)
+                return
+            self._run_handler(self.inline_query_handler, ctx)
+        except Exception as e:
+            logger.exception(f"Error in inline query handler: {e}")
+
+
+def _shared_cache_key(bot_id: str, func: HandlerFunc, key: tuple[Any, ...]) -> str:
+    """Flatten a response cache key into a DynamoDB key: "bot|handler|command|args|lang"."""
+    command, args, lang_code = key
+    return "|".join([bot_id, func.__qualname__, command, " ".join(args), lang_code])
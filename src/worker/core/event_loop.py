@@ -0,0 +1,55 @@
+"""
+Persistent asyncio event loop for async handlers.
+
+The loop (and the thread pool that runs blocking I/O such as `requests` calls) is created
+once per container and reused by every warm invocation, so async handlers pay neither
+loop setup nor new connection pools per update.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, TypeVar
+
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+T = TypeVar("T")
+
+# Matches requests' default per-host connection pool size, so concurrent calls never queue on the pool
+MAX_CONCURRENT_IO = 10
+
+_loop: asyncio.AbstractEventLoop | None = None
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the container-wide thread pool used for blocking I/O."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_IO, thread_name_prefix="handler-io")
+    return _executor
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the container-wide event loop, creating it on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        _loop.set_default_executor(get_executor())
+        asyncio.set_event_loop(_loop)
+        logger.info("Created persistent event loop")
+    return _loop
+
+
+def run(awaitable: Awaitable[T]) -> T:
+    """Run an awaitable to completion on the persistent loop."""
+    return get_loop().run_until_complete(awaitable)
+
+
+async def run_blocking(func: Any, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking callable in the shared thread pool without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    if kwargs:
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+    return await loop.run_in_executor(None, func, *args)
@@ -0,0 +1,90 @@
+"""
+Inline query support.
+
+Inline bots receive a new query on almost every keystroke, most of them near-identical.
+Two container-wide helpers keep that cheap:
+
+- InlineQueryTracker remembers the newest inline query update per user, so a query that
+  has already been superseded by a newer one is dropped instead of answered.
+- InlineResultCache keeps answers per (normalized query, language, offset), so repeated
+  queries are answered without running the handler again.
+"""
+
+from typing import Any
+
+from .cache import TTLCache
+
+# Telegram stops accepting answers after ~10s; remembering users longer than that is pointless
+TRACKER_TTL_SECONDS = 60
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query: "  Cat   Pics " -> "cat pics"."""
+    return " ".join(query.lower().split())
+
+
+class InlineQueryTracker:
+    """
+    Newest inline query update_id seen per user.
+
+    update_ids increase per bot, so every Dispatcher (one per bot) owns its own tracker.
+
+    Args:
+        max_users: Users remembered before the least recently active one is evicted
+    """
+
+    def __init__(self, max_users: int = 4096):
+        self._latest = TTLCache(max_entries=max_users, ttl=TRACKER_TTL_SECONDS)
+
+    def observe(self, update: dict[str, Any]) -> None:
+        """Record an update (no-op unless it is an inline query)."""
+        user_id = _inline_user_id(update)
+        if user_id is None:
+            return
+        latest = self._latest.get(user_id)
+        if latest is None or update["update_id"] > latest:
+            self._latest.set(user_id, update["update_id"])
+
+    def is_stale(self, update: dict[str, Any]) -> bool:
+        """Whether a newer inline query from the same user has already been seen."""
+        user_id = _inline_user_id(update)
+        if user_id is None:
+            return False
+        latest = self._latest.get(user_id)
+        return latest is not None and latest > update["update_id"]
+
+
+class InlineResultCache:
+    """
+    Answers to inline queries, keyed by (normalized query, language, offset).
+
+    Entries live as long as the `cache_time` they were answered with, the same freshness
+    the bot already accepts from Telegram's own cache. Personal answers are never cached.
+
+    Args:
+        max_entries: In-process LRU size
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self._cache = TTLCache(max_entries=max_entries)
+
+    @staticmethod
+    def make_key(query: str, lang_code: str, offset: str) -> tuple[str, str, str]:
+        return normalize_query(query), lang_code, offset
+
+    def get(self, query: str, lang_code: str, offset: str) -> dict[str, Any] | None:
+        """Return the cached answer (answer_inline_query keyword arguments), if fresh."""
+        return self._cache.get(self.make_key(query, lang_code, offset))
+
+    def put(self, query: str, lang_code: str, offset: str, answer: dict[str, Any]) -> None:
+        """Cache an answer for its `cache_time`."""
+        if answer.get("is_personal") or answer.get("cache_time", 0) <= 0:
+            return
+        self._cache.set(self.make_key(query, lang_code, offset), answer, ttl=answer["cache_time"])
+
+
+def _inline_user_id(update: dict[str, Any]) -> int | None:
+    inline_query = update.get("inline_query")
+    if not inline_query or "update_id" not in update:
+        return None
+    return inline_query.get("from", {}).get("id")
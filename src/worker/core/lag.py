@@ -0,0 +1,210 @@
+"""
+End-to-end lag tracking, from the Telegram message timestamp to the reply.
+
+Every update passes a chain of timestamps:
+
+    Telegram `date` -> receiver `received_at` -> SQS SentTimestamp
+        -> SQS ApproximateFirstReceiveTimestamp -> handler start -> last reply sent
+
+The gaps between them split a user's wait into stages:
+
+- webhook:  Telegram -> receiver (Telegram's `date` has 1s resolution, so this is coarse)
+- receiver: receiver -> enqueued
+- queue:    enqueued -> picked up by the Lambda poller (backlog, DelaySeconds)
+- dispatch: picked up -> handler start (batching window, cold start, earlier records in the batch)
+- handler:  handler start -> reply sent
+- total:    Telegram (or receiver, for updates without a date) -> reply sent
+
+Each update is logged with its breakdown; the stages are emitted as per-lane EMF metrics
+(all values of a batch in one distribution per stage) and the totals are collected in an
+in-process histogram that is logged periodically.
+"""
+
+import bisect
+import time
+from typing import Any
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+
+from .lanes import get_lane
+from .scheduler import JOB_KEY
+
+logger = Logger()
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Log the histograms every N tracked updates
+HISTOGRAM_LOG_EVERY = 1000
+
+# Update types whose payload carries a `date` (edits carry `edit_date` as well)
+_DATED_UPDATE_TYPES = ("message", "edited_message", "channel_post", "edited_channel_post")
+
+
+class LagHistogram:
+    """Container-lifetime bucketed histogram of lag values (ms)."""
+
+    def __init__(self, buckets_ms: tuple[int, ...] = HISTOGRAM_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.total += 1
+
+    def percentile(self, p: float) -> float | None:
+        """Upper bound of the bucket holding the p-th percentile (inf for the open-ended bucket)."""
+        if not self.total:
+            return None
+        rank = p / 100 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return float(self.buckets_ms[i]) if i < len(self.buckets_ms) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-safe summary: percentiles in the open-ended bucket are reported as its label (">60000")."""
+        overflow = f">{self.buckets_ms[-1]}"
+        labels = [f"<={bound}" for bound in self.buckets_ms] + [overflow]
+        percentiles = {f"p{p}_ms": self.percentile(p) for p in (50, 90, 99)}
+        return {
+            "count": self.total,
+            "buckets": dict(zip(labels, self.counts)),
+            # inf would be logged as the bare token Infinity, which is not valid JSON
+            **{name: overflow if value == float("inf") else value for name, value in percentiles.items()},
+        }
+
+
+class LagTracker:
+    """Collects per-update lag breakdowns for a batch and flushes them as metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, EphemeralMetrics] = {}
+        self.histograms: dict[str, LagHistogram] = {}
+        self._tracked = 0
+
+    def record(
+        self,
+        record: dict[str, Any],
+        update: dict[str, Any],
+        handler_started: float,
+        replied_at: float | None,
+    ) -> dict[str, float] | None:
+        """
+        Track one processed update.
+
+        Args:
+            record: The SQS record (attributes and message attributes)
+            update: The parsed update
+            handler_started: Epoch seconds the worker started processing the update
+            replied_at: Epoch seconds the last reply (send/edit/answer call) completed, if any
+
+        Returns:
+            The breakdown in milliseconds per stage (None for scheduled jobs).
+        """
+        # Scheduled jobs wait in the queue on purpose
+        if JOB_KEY in update:
+            return None
+
+        # Without a reply during the handler, lag is measured to the handler's end
+        replied = replied_at is not None and replied_at >= handler_started
+        finished_ms = (replied_at if replied else time.time()) * 1000
+        breakdown = _breakdown(record, update, handler_started * 1000, finished_ms)
+        if not breakdown:
+            return None
+
+        lane = get_lane(record)
+        metrics = self._metrics.get(lane)
+        if metrics is None:
+            metrics = self._metrics[lane] = EphemeralMetrics()
+            metrics.add_dimension(name="Lane", value=lane)
+        for stage, value in breakdown.items():
+            metrics.add_metric(name=f"Lag{stage.capitalize()}", unit=MetricUnit.Milliseconds, value=value)
+
+        if "total" in breakdown:
+            self.histograms.setdefault(lane, LagHistogram()).observe(breakdown["total"])
+
+        logger.info(
+            "Update lag",
+            extra={
+                "update_id": update.get("update_id"),
+                "lane": lane,
+                "replied": replied,
+                **{f"{stage}_ms": round(value) for stage, value in breakdown.items()},
+            },
+        )
+
+        self._tracked += 1
+        if self._tracked % HISTOGRAM_LOG_EVERY == 0:
+            self.log_histograms()
+        return breakdown
+
+    def flush(self) -> None:
+        """Emit the batch's lag metrics (one EMF document per lane)."""
+        for metrics in self._metrics.values():
+            metrics.flush_metrics()
+        self._metrics.clear()
+
+    def log_histograms(self) -> None:
+        logger.info(
+            "Lag histogram",
+            extra={"histograms": {lane: histogram.snapshot() for lane, histogram in self.histograms.items()}},
+        )
+
+
+def _breakdown(
+    record: dict[str, Any], update: dict[str, Any], started_ms: float, finished_ms: float
+) -> dict[str, float]:
+    """Milliseconds per stage, for the stages whose two timestamps are both known."""
+    attributes = record.get("attributes", {})
+    timestamps = {
+        "date": _telegram_date_ms(update),
+        "received": _message_attribute_number(record, "received_at"),
+        "sent": _number(attributes.get("SentTimestamp")),
+        "first_received": _number(attributes.get("ApproximateFirstReceiveTimestamp")),
+        "started": started_ms,
+        "finished": finished_ms,
+    }
+    spans = {
+        "webhook": ("date", "received"),
+        "receiver": ("received", "sent"),
+        "queue": ("sent", "first_received"),
+        "dispatch": ("first_received", "started"),
+        "handler": ("started", "finished"),
+    }
+
+    breakdown = {}
+    for stage, (start, end) in spans.items():
+        if timestamps[start] is not None and timestamps[end] is not None:
+            # Clocks of different hosts (and Telegram's whole seconds) can make a gap slightly negative
+            breakdown[stage] = max(0.0, timestamps[end] - timestamps[start])
+
+    origin = timestamps["date"] if timestamps["date"] is not None else timestamps["received"]
+    if origin is not None:
+        breakdown["total"] = max(0.0, finished_ms - origin)
+    return breakdown
+
+
+def _telegram_date_ms(update: dict[str, Any]) -> float | None:
+    for update_type in _DATED_UPDATE_TYPES:
+        payload = update.get(update_type)
+        if payload:
+            date = payload.get("edit_date") or payload.get("date")
+            return date * 1000 if date else None
+    return None
+
+
+def _message_attribute_number(record: dict[str, Any], name: str) -> float | None:
+    attribute = record.get("messageAttributes", {}).get(name, {})
+    return _number(attribute.get("stringValue"))
+
+
+def _number(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
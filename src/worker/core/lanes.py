@@ -0,0 +1,45 @@
+"""
+Priority lane bookkeeping for SQS records.
+
+The receiver tags every message with a "lane" attribute (commands / callbacks / inline / default) and
+sends it to that lane's queue. Here the worker reads the lane back and reports how long each
+message waited in its queue, so a backlog in one lane is visible before users notice it.
+"""
+
+import time
+from typing import Any
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.metrics import MetricUnit, single_metric
+
+logger = Logger()
+
+DEFAULT_LANE = "default"
+
+
+def get_lane(record: dict[str, Any]) -> str:
+    """Return the priority lane of an SQS record (messages without the attribute are "default")."""
+    attribute = record.get("messageAttributes", {}).get("lane", {})
+    return attribute.get("stringValue") or DEFAULT_LANE
+
+
+def report_queue_lag(record: dict[str, Any]) -> float | None:
+    """
+    Emit the time (ms) a record spent in its queue, from SentTimestamp to now, per lane.
+
+    Returns:
+        The lag in milliseconds, or None if the record has no SentTimestamp.
+    """
+    sent_timestamp = record.get("attributes", {}).get("SentTimestamp")
+    if sent_timestamp is None:
+        return None
+
+    lane = get_lane(record)
+    lag_ms = max(0.0, time.time() * 1000 - int(sent_timestamp))
+
+    # single_metric: the Lane dimension must not leak onto the invocation's other metrics
+    with single_metric(name="QueueLag", unit=MetricUnit.Milliseconds, value=lag_ms) as metric:
+        metric.add_dimension(name="Lane", value=lane)
+
+    logger.debug("Queue lag", extra={"lane": lane, "lag_ms": round(lag_ms)})
+    return lag_ms
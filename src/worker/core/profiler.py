@@ -0,0 +1,148 @@
+"""
+Warm-container memory profiling.
+
+Leaks in handlers, caches or session state only show up as slow growth across thousands of
+warm invocations, followed by an out-of-memory kill. When enabled, the profiler traces
+allocations with tracemalloc and, every N invocations, diffs a snapshot against the previous
+one and logs the top-growing allocation sites together with RSS and per-type object counts.
+
+Overhead is controlled by sampling containers, the snapshot interval and the traceback depth
+(see core/__init__.py).
+"""
+
+import gc
+import random
+import resource
+import tracemalloc
+from collections import Counter
+
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+
+from . import (
+    MEMORY_PROFILE_EVERY_N,
+    MEMORY_PROFILE_FRAMES,
+    MEMORY_PROFILE_OBJECT_TYPES,
+    MEMORY_PROFILE_SAMPLE_RATE,
+    MEMORY_PROFILE_TOP_N,
+)
+
+logger = Logger()
+metrics = Metrics()
+
+# Allocations made by the profiler itself are noise
+_TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB (peak RSS if /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemoryProfiler:
+    """
+    Periodic tracemalloc snapshot differ.
+
+    Args:
+        every_n: Snapshot every N invocations (0 disables profiling)
+        sample_rate: Probability that this container profiles at all
+        frames: Traceback depth stored per allocation
+        top_n: Allocation sites logged per snapshot
+        object_types: Object types logged per snapshot (0 skips the gc walk)
+    """
+
+    def __init__(
+        self,
+        every_n: int = MEMORY_PROFILE_EVERY_N,
+        sample_rate: float = MEMORY_PROFILE_SAMPLE_RATE,
+        frames: int = MEMORY_PROFILE_FRAMES,
+        top_n: int = MEMORY_PROFILE_TOP_N,
+        object_types: int = MEMORY_PROFILE_OBJECT_TYPES,
+    ):
+        self.every_n = every_n
+        self.frames = max(1, frames)
+        self.top_n = top_n
+        self.object_types = object_types
+        self.enabled = every_n > 0 and random.random() < sample_rate
+
+        self.invocations = 0
+        self._previous_snapshot: tracemalloc.Snapshot | None = None
+        self._previous_types: Counter[str] = Counter()
+
+        if self.enabled:
+            tracemalloc.start(self.frames)
+            logger.info("Memory profiling enabled", extra={"every_n": every_n, "frames": self.frames})
+
+    def after_invocation(self) -> None:
+        """Count an invocation and take/diff a snapshot every `every_n` of them."""
+        if not self.enabled:
+            return
+
+        self.invocations += 1
+        if self.invocations % self.every_n:
+            return
+
+        try:
+            self._report()
+        except Exception as e:
+            # Profiling must never fail an invocation
+            logger.warning(f"Memory profiling snapshot failed: {e}")
+
+    def _report(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        rss_mb = current_rss_mb()
+
+        growth = []
+        if self._previous_snapshot is not None:
+            key_type = "traceback" if self.frames > 1 else "lineno"
+            stats = snapshot.compare_to(self._previous_snapshot, key_type)
+            # Sorted by absolute change: drop the shrinking sites before taking the top N
+            growing = [stat for stat in stats if stat.size_diff > 0][: self.top_n]
+            growth = [
+                {
+                    # Allocation site first, then its callers
+                    "site": " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in reversed(stat.traceback)),
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                }
+                for stat in growing
+            ]
+        self._previous_snapshot = snapshot
+
+        object_growth = {}
+        if self.object_types > 0:
+            types = Counter(type(obj).__name__ for obj in gc.get_objects())
+            object_growth = {
+                name: {"count": count, "diff": count - self._previous_types.get(name, 0)}
+                for name, count in types.most_common(self.object_types)
+            }
+            self._previous_types = types
+
+        logger.info(
+            "Memory profile",
+            extra={
+                "invocations": self.invocations,
+                "rss_mb": round(rss_mb, 1),
+                "traced_mb": round(traced_current / 1024 / 1024, 2),
+                "traced_peak_mb": round(traced_peak / 1024 / 1024, 2),
+                "top_growth": growth,
+                "object_types": object_growth,
+            },
+        )
+        metrics.add_metric(name="MemoryRss", unit=MetricUnit.Megabytes, value=rss_mb)
+        metrics.add_metric(name="MemoryTraced", unit=MetricUnit.Megabytes, value=traced_current / 1024 / 1024)
@@ -0,0 +1,219 @@
+"""
+Scheduled and delayed messages.
+
+- Delays up to 15 minutes are sent straight to the updates queue with SQS DelaySeconds.
+- Longer delays are stored in minute buckets in DynamoDB; the sweeper Lambda runs every
+  minute, queries the due buckets and moves their jobs onto the queue in batches.
+
+Either way the job comes back to the worker as a `{"scheduled_job": {...}}` message and
+is executed only after its delivery marker has been claimed, so a job is never delivered
+twice even if SQS redelivers it or two sweeps overlap. Jobs remember the bot that scheduled
+them and are sent back tagged with its ID, so the worker delivers them as that bot.
+"""
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable
+
+import requests
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from repositories import DEFAULT_BOT_ID
+from repositories.queue_client import MAX_BATCH_SIZE, MAX_DELAY_SECONDS, UpdatesQueueClient
+from repositories.scheduled_job_repository import ScheduledJobRepository, bucket_for
+from repositories.telegram_client import TelegramClient
+
+logger = Logger()
+metrics = Metrics()
+
+# Key marking a scheduled job in an SQS message body (vs. a raw Telegram update)
+JOB_KEY = "scheduled_job"
+
+# Buckets re-checked by every sweep, so a missed or failed sweep is caught up later
+SWEEP_LOOKBACK_BUCKETS = 15
+
+# Parallel SendMessageBatch calls per sweep
+SWEEP_SEND_CONCURRENCY = 8
+
+# Jobs whose send never reached Telegram are re-enqueued after this delay, up to this many attempts
+RETRY_DELAY_SECONDS = 30
+MAX_DELIVERY_ATTEMPTS = 5
+
+
+class Scheduler:
+    """Schedules, sweeps and executes delayed messages."""
+
+    def __init__(
+        self,
+        bot: TelegramClient,
+        job_repo: ScheduledJobRepository,
+        queue: UpdatesQueueClient,
+    ):
+        self.bot = bot
+        self.job_repo = job_repo
+        self.queue = queue
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def schedule(self, chat_id: int, delay: float, text: str) -> str:
+        """
+        Send `text` to `chat_id` after `delay` seconds.
+
+        Returns:
+            The job ID.
+
+        Raises:
+            ValueError: If there is no chat to send to (e.g. inline queries)
+        """
+        if chat_id is None:
+            raise ValueError("Scheduled messages require a chat_id")
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "bot_id": self.bot.bot_id,
+            "chat_id": chat_id,
+            "text": text,
+            "due_at": int(time.time() + max(0.0, delay)),
+        }
+
+        if delay <= MAX_DELAY_SECONDS:
+            self.queue.send({JOB_KEY: job}, delay_seconds=int(delay), bot_id=job["bot_id"])
+            route = "sqs"
+        else:
+            self.job_repo.put_job(job)
+            route = "dynamodb"
+
+        logger.info("Job scheduled", extra={"job_id": job["job_id"], "delay": delay, "route": route})
+        return job["job_id"]
+
+    # ------------------------------------------------------------------
+    # Sweeping (runs in the sweeper Lambda)
+    # ------------------------------------------------------------------
+
+    def sweep(self, now: float | None = None) -> int:
+        """
+        Move due jobs from DynamoDB onto the updates queue.
+
+        Covers the lookback window plus the next bucket; jobs not yet due get the
+        remaining time as DelaySeconds, so delivery stays on time between sweeps.
+
+        Returns:
+            Number of jobs enqueued.
+        """
+        now = time.time() if now is None else now
+        current = int(bucket_for(now))
+        buckets = [str(b) for b in range(current - SWEEP_LOOKBACK_BUCKETS, current + 2)]
+
+        enqueued = 0
+        with ThreadPoolExecutor(max_workers=SWEEP_SEND_CONCURRENCY) as executor:
+            for bucket in buckets:
+                jobs, invalid = _parse_jobs(self.job_repo.iter_bucket(bucket))
+                if not jobs and not invalid:
+                    continue
+
+                batches = [jobs[i : i + MAX_BATCH_SIZE] for i in range(0, len(jobs), MAX_BATCH_SIZE)]
+                sent = [job for batch in executor.map(lambda b: self._enqueue_batch(b, now), batches) for job in batch]
+
+                # Only jobs SQS accepted leave the table; the rest are retried by the next sweep.
+                # Unparseable jobs are dropped (they are logged in full) so they cannot block their bucket.
+                self.job_repo.delete_jobs(sent + invalid)
+                enqueued += len(sent)
+
+        logger.info("Sweep finished", extra={"buckets": len(buckets), "enqueued": enqueued})
+        metrics.add_metric(name="ScheduledJobsSwept", unit=MetricUnit.Count, value=enqueued)
+        return enqueued
+
+    def _enqueue_batch(self, jobs: list[tuple[dict[str, Any], dict[str, Any]]], now: float) -> list[dict[str, Any]]:
+        """Send up to 10 (stored item, payload) jobs in one SendMessageBatch; return the items SQS accepted."""
+        entries = [
+            (str(i), {JOB_KEY: payload}, payload["due_at"] - now, payload["bot_id"])
+            for i, (_, payload) in enumerate(jobs)
+        ]
+        try:
+            accepted = self.queue.send_batch(entries)
+        except Exception as e:
+            # Jobs stay in their bucket and are retried by the next sweep
+            logger.exception(f"Failed to enqueue job batch: {e}")
+            return []
+        return [jobs[int(entry_id)][0] for entry_id in accepted]
+
+    # ------------------------------------------------------------------
+    # Execution (runs in the worker)
+    # ------------------------------------------------------------------
+
+    def run_job(self, job: dict[str, Any]) -> None:
+        """
+        Deliver a due job at most once (the claim happens before the send).
+
+        If no attempt of the send can have reached Telegram (circuit open, deadline hit before sending,
+        failure to connect, 429), the claim is released and the job re-enqueued with a short delay.
+        After a 5xx, a read timeout or a connection dropped mid-request the claim is kept and the job
+        is recorded as failed: Telegram may already have delivered it.
+        """
+        job_id = job["job_id"]
+        if not self.job_repo.claim_delivery(job_id):
+            logger.info(f"Skipping already delivered job {job_id}")
+            metrics.add_metric(name="ScheduledJobDuplicates", unit=MetricUnit.Count, value=1)
+            return
+
+        try:
+            self.bot.send_message(job["chat_id"], job["text"])
+        except requests.exceptions.RequestException as e:
+            metrics.add_metric(name="ScheduledJobsFailed", unit=MetricUnit.Count, value=1)
+            attempt = job.get("attempt", 1)
+            if not _not_delivered(e) or attempt >= MAX_DELIVERY_ATTEMPTS:
+                logger.error("Scheduled job failed", extra={"job_id": job_id, "attempt": attempt, "error": str(e)})
+                raise
+            self._retry(job, attempt, e)
+            return
+
+        metrics.add_metric(name="ScheduledJobsDelivered", unit=MetricUnit.Count, value=1)
+        logger.info("Scheduled job delivered", extra={"job_id": job_id, "late_by": time.time() - job["due_at"]})
+
+    def _retry(self, job: dict[str, Any], attempt: int, error: Exception) -> None:
+        """Release the job's claim and send it back through the queue."""
+        logger.warning(
+            "Scheduled job not delivered, retrying",
+            extra={"job_id": job["job_id"], "attempt": attempt, "delay": RETRY_DELAY_SECONDS, "error": str(error)},
+        )
+        self.job_repo.release_delivery(job["job_id"])
+        retry = {**job, "attempt": attempt + 1}
+        self.queue.send({JOB_KEY: retry}, delay_seconds=RETRY_DELAY_SECONDS, bot_id=job.get("bot_id", DEFAULT_BOT_ID))
+
+
+def _not_delivered(error: Exception) -> bool:
+    """
+    Whether a failed send certainly never reached Telegram, so retrying cannot deliver it twice.
+    Errors the client did not classify count as possibly delivered.
+    """
+    return not getattr(error, "may_have_been_sent", True)
+
+
+def _parse_jobs(
+    items: Iterable[dict[str, Any]],
+) -> tuple[list[tuple[dict[str, Any], dict[str, Any]]], list[dict[str, Any]]]:
+    """Split stored jobs into (item, payload) pairs and items that cannot be delivered."""
+    jobs, invalid = [], []
+    for item in items:
+        try:
+            jobs.append((item, _job_payload(item)))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error("Dropping invalid scheduled job", extra={"job": item, "error": str(e)})
+            metrics.add_metric(name="ScheduledJobsInvalid", unit=MetricUnit.Count, value=1)
+            invalid.append(item)
+    return jobs, invalid
+
+
+def _job_payload(item: dict[str, Any]) -> dict[str, Any]:
+    """Strip DynamoDB bookkeeping attributes (and Decimals) from a stored job."""
+    return {
+        "job_id": item["job_id"],
+        # Jobs stored before multi-bot support belong to the default bot
+        "bot_id": item.get("bot_id", DEFAULT_BOT_ID),
+        "chat_id": int(item["chat_id"]),
+        "text": item["text"],
+        "due_at": int(item["due_at"]),
+    }
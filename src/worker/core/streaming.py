@@ -0,0 +1,132 @@
+"""
+Progressive replies for long-running handlers.
+
+A placeholder message is sent right away and then edited in place as content arrives.
+Edits are coalesced so a chat gets at most one editMessageText per `min_interval`,
+which keeps the bot inside Telegram's edit rate limits no matter how fast chunks arrive.
+"""
+
+import time
+from typing import Any
+
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from repositories.telegram_client import TelegramClient
+
+logger = Logger()
+metrics = Metrics()
+
+# Telegram allows ~1 message per second in a private chat and ~20 per minute in a group
+PRIVATE_CHAT_EDIT_INTERVAL = 1.0
+GROUP_CHAT_EDIT_INTERVAL = 3.0
+
+MAX_MESSAGE_LENGTH = 4096
+
+
+class ReplyStream:
+    """
+    A message that grows while the handler works.
+
+    Usage:
+        with ctx.stream_reply() as stream:
+            for chunk in call_llm():
+                stream.write(chunk)
+
+    Pending content is flushed on the next write after the interval has passed and
+    on close. Use the stream as a context manager or call close() yourself: otherwise
+    the text written during the last interval is never sent.
+
+    Raises:
+        ValueError: If there is no chat to reply to (e.g. for inline queries)
+    """
+
+    def __init__(
+        self,
+        bot: TelegramClient,
+        chat_id: int,
+        placeholder: str = "⏳",
+        min_interval: float | None = None,
+        parse_mode: str | None = None,
+    ):
+        if chat_id is None:
+            raise ValueError("stream_reply requires a chat")
+        self._bot = bot
+        self.chat_id = chat_id
+        self.placeholder = placeholder
+        self.parse_mode = parse_mode
+        if min_interval is None:
+            # Negative chat IDs are groups/supergroups/channels
+            min_interval = GROUP_CHAT_EDIT_INTERVAL if chat_id < 0 else PRIVATE_CHAT_EDIT_INTERVAL
+        self.min_interval = min_interval
+
+        self.message_id: int | None = None
+        self.text = ""
+        self._sent_text = ""
+        self._last_edit = 0.0
+        self._closed = False
+
+        # Stats: edits actually sent vs. updates folded into a later edit
+        self.edits_sent = 0
+        self.edits_saved = 0
+
+    def __enter__(self) -> "ReplyStream":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Send the placeholder message."""
+        if self.message_id is not None:
+            return
+        message = self._bot.send_message(self.chat_id, self.placeholder, parse_mode=None)
+        self.message_id = message.get("message_id") if message else None
+        self._last_edit = time.monotonic()
+
+    def write(self, chunk: str) -> None:
+        """Append a chunk to the message."""
+        self.update(self.text + chunk)
+
+    def update(self, text: str) -> None:
+        """Replace the whole message text."""
+        self.text = text
+        if time.monotonic() - self._last_edit >= self.min_interval:
+            self.flush()
+        else:
+            self.edits_saved += 1
+
+    def flush(self) -> None:
+        """Edit the message now if its text changed since the last edit."""
+        if self.message_id is None:
+            self.start()
+
+        text = self.text
+        if len(text) > MAX_MESSAGE_LENGTH:
+            text = text[: MAX_MESSAGE_LENGTH - 1] + "…"
+
+        if not text or text == self._sent_text or self.message_id is None:
+            return
+
+        self._bot.edit_message_text(self.chat_id, self.message_id, text, parse_mode=self.parse_mode)
+        self._sent_text = text
+        self._last_edit = time.monotonic()
+        self.edits_sent += 1
+
+    def close(self) -> None:
+        """Send the final text and report how many edits were coalesced."""
+        if self._closed:
+            return
+        self._closed = True
+
+        # A write folded into this final edit is not a saved edit
+        if self.text != self._sent_text and self.edits_saved:
+            self.edits_saved -= 1
+        self.flush()
+
+        logger.info(
+            "Stream reply finished",
+            extra={"edits_sent": self.edits_sent, "edits_saved": self.edits_saved, "chars": len(self.text)},
+        )
+        metrics.add_metric(name="StreamReplyEdits", unit=MetricUnit.Count, value=self.edits_sent)
+        metrics.add_metric(name="StreamReplyEditsSaved", unit=MetricUnit.Count, value=self.edits_saved)
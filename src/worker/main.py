@@ -1,45 +1,133 @@
 """Worker Lambda: Processes SQS messages."""
 
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Any
 
-from aws_lambda_powertools import Logger
-from core.dispatcher import Dispatcher
-from repositories.telegram_client import TelegramClient
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit, single_metric
+from core.bots import BotRegistry, get_bot_id
+from core.lag import LagTracker
+from core.lanes import report_queue_lag
+from core.profiler import MemoryProfiler
+from repositories import (
+    BOT_TOKENS,
+    DEFAULT_BOT_ID,
+    PREWARM_CONNECTIONS,
+    QUEUE_URL,
+    TG_RESPONSE_CACHE_TABLE_NAME,
+    TG_SCHEDULED_JOBS_TABLE_NAME,
+)
+from repositories.queue_client import UpdatesQueueClient
+from repositories.response_cache_repo import ResponseCacheRepository
+from repositories.scheduled_job_repository import ScheduledJobRepository
 from repositories.user_repository import UserRepository
 from services.handlers import register_handlers
 
 logger = Logger()
+metrics = Metrics()
 
 # --- Initialization (Singleton Pattern) ---
 # Initialize these OUTSIDE the handler to reuse connections across warm starts
-_bot = TelegramClient()
 _user_repo = UserRepository()
-_dispatcher = Dispatcher(_bot, _user_repo)
+_scheduling_enabled = bool(QUEUE_URL and TG_SCHEDULED_JOBS_TABLE_NAME)
 
-# Register the user's handlers
-register_handlers(_dispatcher)
-logger.info("Dispatcher initialized and handlers registered")
+# One Dispatcher per bot, built on the bot's first update and cached for the container's lifetime
+_registry = BotRegistry(
+    BOT_TOKENS,
+    setup=register_handlers,
+    user_repo=_user_repo,
+    response_cache_repo=ResponseCacheRepository() if TG_RESPONSE_CACHE_TABLE_NAME else None,
+    job_repo=ScheduledJobRepository() if _scheduling_enabled else None,
+    queue=UpdatesQueueClient() if _scheduling_enabled else None,
+)
 
+# The default bot is built eagerly so its handlers are registered during init
+_bot = _registry.get(DEFAULT_BOT_ID).bot
+logger.info("Dispatcher initialized and handlers registered", extra={"bots": len(BOT_TOKENS)})
 
-def lambda_handler(event: dict[str, Any], context: Any) -> None:
+# End-to-end lag per update (Telegram date -> reply); its histograms live as long as the container
+_lag_tracker = LagTracker()
+
+# Opt-in leak hunting across warm invocations (MEMORY_PROFILE_EVERY_N > 0)
+_profiler = MemoryProfiler()
+
+
+# A record is only started with at least this much of the invocation left; later records go back to SQS
+MIN_RECORD_TIME_SECONDS = 5
+
+# Upper bound on init time spent prewarming (the Lambda init phase is limited to 10s)
+PREWARM_TIMEOUT_SECONDS = 3
+
+
+def _prewarm_connections() -> bool:
+    """
+    Open Telegram and DynamoDB keep-alive connections in parallel during the init phase.
+    All bots share the default bot's HTTP session, so one getMe warms the Bot API pool for every bot.
+    """
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=2)
+    futures = [executor.submit(_bot.prewarm), executor.submit(_user_repo.prewarm)]
+    done, _ = wait(futures, timeout=PREWARM_TIMEOUT_SECONDS)
+    executor.shutdown(wait=False)
+
+    results = [future.result() if future in done else False for future in futures]
+    logger.info(
+        "Connections prewarmed",
+        extra={"telegram": results[0], "dynamodb": results[1], "ms": round((time.perf_counter() - started) * 1000)},
+    )
+    return all(results)
+
+
+_prewarmed = _prewarm_connections() if PREWARM_CONNECTIONS else False
+_first_update = True
+
+
+@metrics.log_metrics
+def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     SQS Event Handler.
+
+    Returns the records that were not processed before the invocation ran out of time as
+    batch item failures, so SQS redelivers only those. Records that failed while processing
+    are logged and not retried.
     """
+    started = time.perf_counter()
     logger.info("Received batch", count=len(event.get("Records", [])))
 
-    for record in event["Records"]:
+    # Telegram timeouts/retries must fit in what is left of this invocation
+    _registry.set_deadline(context)
+
+    # Look ahead: inline queries superseded by a newer one later in this batch are dropped unanswered
+    _observe_inline_queries(event["Records"])
+
+    unprocessed: list[str] = []
+    records = event["Records"]
+    for index, record in enumerate(records):
+        if _out_of_time(context):
+            unprocessed = [r["messageId"] for r in records[index:]]
+            logger.warning("Invocation nearly out of time, returning records to the queue", count=len(unprocessed))
+            break
+
         try:
+            # 0. Per-lane queue lag (SentTimestamp -> now)
+            report_queue_lag(record)
+
             # 1. Parse Payload
             update_payload = json.loads(record["body"])
 
-            # 2. Process via Dispatcher
+            # 2. Process via the Dispatcher of the bot the update was sent to
             # The dispatcher handles logic, auto-tracking, and error logging internally
-            _dispatcher.process_update(update_payload)
+            dispatcher = _registry.get(get_bot_id(record))
+            handler_started = time.time()
+            dispatcher.process_update(update_payload)
+
+            # 3. Lag breakdown: webhook / receiver / queue / dispatch / handler
+            _lag_tracker.record(record, update_payload, handler_started, dispatcher.bot.last_reply_at)
 
         except Exception as e:
-            # Critical: Capture errors to prevent SQS partial batch failure loop
-            # In a real prod env, you might want to send this to a DLQ explicitly if needed
+            # Critical: Capture errors so a broken record is not redelivered in a loop
             logger.error(
                 "Critical error processing record",
                 extra={"message_id": record.get("messageId"), "error": e},
@@ -47,3 +135,38 @@ def lambda_handler(event: dict[str, Any], context: Any) -> None:
             )
 
     logger.info("Batch processing completed")
+    _lag_tracker.flush()
+    _report_first_update_latency(started)
+    _profiler.after_invocation()
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in unprocessed]}
+
+
+def _out_of_time(context: Any) -> bool:
+    remaining_ms = getattr(context, "get_remaining_time_in_millis", None)
+    return remaining_ms is not None and remaining_ms() < MIN_RECORD_TIME_SECONDS * 1000
+
+
+def _observe_inline_queries(records: list[dict[str, Any]]) -> None:
+    """Let each bot's Dispatcher see every inline query of the batch before any is processed."""
+    for record in records:
+        # Cheap pre-check: only inline queries are parsed twice
+        if '"inline_query"' not in record.get("body", ""):
+            continue
+        try:
+            _registry.get(get_bot_id(record)).inline_queries.observe(json.loads(record["body"]))
+        except Exception:
+            # The main loop reports broken records
+            continue
+
+
+def _report_first_update_latency(started: float) -> None:
+    """Emit the latency of a container's first batch, split by whether connections were prewarmed."""
+    global _first_update
+    if not _first_update:
+        return
+    _first_update = False
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    with single_metric(name="FirstUpdateLatency", unit=MetricUnit.Milliseconds, value=latency_ms) as metric:
+        metric.add_dimension(name="Prewarmed", value=str(_prewarmed).lower())
+    logger.info("First update processed", extra={"latency_ms": round(latency_ms), "prewarmed": _prewarmed})
@@ -1,8 +1,32 @@
+import json
 import os
 
 TG_USERS_TABLE_NAME = os.environ.get("TG_USERS_TABLE_NAME")
 TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org/bot")
 BOT_TOKEN = os.environ.get("BOT_TOKEN")
 
+# Multi-bot tenancy: every bot served by this worker, parsed once per container.
+# {"<bot_id>": "<token>", ...}; BOT_TOKEN is the "default" bot of the legacy /webhook route.
+DEFAULT_BOT_ID = "default"
+BOT_TOKENS: dict[str, str] = {**json.loads(os.environ.get("BOT_TOKENS") or "{}"), DEFAULT_BOT_ID: BOT_TOKEN}
+
+# Optional: share @dp.cached(shared=True) responses across containers
+TG_RESPONSE_CACHE_TABLE_NAME = os.environ.get("TG_RESPONSE_CACHE_TABLE_NAME")
+
+# Scheduled jobs: short delays go through the updates queue, long ones wait in DynamoDB
+QUEUE_URL = os.environ.get("QUEUE_URL")
+TG_SCHEDULED_JOBS_TABLE_NAME = os.environ.get("TG_SCHEDULED_JOBS_TABLE_NAME")
+
+# Open Telegram/DynamoDB connections during the init phase, before the first update arrives
+PREWARM_CONNECTIONS = os.environ.get("PREWARM_CONNECTIONS", "true").lower() == "true"
+
+# Telegram API resilience: attempts per call, and circuit breaker tuning
+TELEGRAM_MAX_ATTEMPTS = int(os.environ.get("TELEGRAM_MAX_ATTEMPTS", "3"))
+TELEGRAM_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("TELEGRAM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+TELEGRAM_CIRCUIT_RECOVERY_SECONDS = float(os.environ.get("TELEGRAM_CIRCUIT_RECOVERY_SECONDS", "30"))
+
+# Optional: persist the content-hash -> file_id cache across containers
+TG_FILE_IDS_TABLE_NAME = os.environ.get("TG_FILE_IDS_TABLE_NAME")
+
 if not TG_USERS_TABLE_NAME or not BOT_TOKEN:
     raise ValueError("TG_USERS_TABLE_NAME and BOT_TOKEN must be set")
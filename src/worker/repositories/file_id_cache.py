@@ -0,0 +1,81 @@
+"""
+Content-hash -> Telegram file_id cache.
+
+Once Telegram has stored a file it can be re-sent by file_id without uploading the bytes again.
+Entries live in memory for the lifetime of the container and, when TG_FILE_IDS_TABLE_NAME is set,
+are persisted in DynamoDB so every container (and every deploy) shares them.
+"""
+
+from collections import OrderedDict
+
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+from repositories import DEFAULT_BOT_ID, TG_FILE_IDS_TABLE_NAME
+from repositories.aws_clients import dynamodb
+
+logger = Logger()
+
+
+class FileIdCache:
+    """
+    Two-level (memory + optional DynamoDB) cache of uploaded file_ids.
+
+    Keys are "<media kind>:<sha256 of content>", since Telegram file_ids are only valid
+    for the media type they were uploaded as. They are also only valid for the bot that
+    uploaded them, so keys of other bots than the default one are prefixed with the bot ID.
+    """
+
+    def __init__(self, table_name: str | None = TG_FILE_IDS_TABLE_NAME, max_entries: int = 1024):
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._max_entries = max_entries
+        self._table = dynamodb.Table(table_name) if table_name else None
+        logger.info("FileIdCache initialized", extra={"table_name": table_name})
+
+    @staticmethod
+    def make_key(kind: str, content_hash: str, bot_id: str = DEFAULT_BOT_ID) -> str:
+        if bot_id == DEFAULT_BOT_ID:
+            return f"{kind}:{content_hash}"
+        return f"{bot_id}:{kind}:{content_hash}"
+
+    def get(self, key: str) -> str | None:
+        """Return the cached file_id for key, checking memory before DynamoDB."""
+        file_id = self._memory.get(key)
+        if file_id is not None:
+            self._memory.move_to_end(key)
+            return file_id
+
+        if self._table is None:
+            return None
+
+        try:
+            response = self._table.get_item(Key={"content_key": key}, ConsistentRead=False)
+        except ClientError as e:
+            # The cache is an optimization: fall back to uploading
+            logger.warning(f"FileIdCache lookup failed for {key}: {e}")
+            return None
+
+        item = response.get("Item")
+        if item is None:
+            return None
+
+        file_id = item["file_id"]
+        self._remember(key, file_id)
+        return file_id
+
+    def put(self, key: str, file_id: str) -> None:
+        """Store a file_id in memory and, if configured, in DynamoDB."""
+        self._remember(key, file_id)
+
+        if self._table is None:
+            return
+
+        try:
+            self._table.put_item(Item={"content_key": key, "file_id": file_id})
+        except ClientError as e:
+            logger.warning(f"FileIdCache persist failed for {key}: {e}")
+
+    def _remember(self, key: str, file_id: str) -> None:
+        self._memory[key] = file_id
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
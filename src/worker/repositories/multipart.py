@@ -0,0 +1,165 @@
+"""
+Streaming multipart/form-data body for Telegram file uploads.
+
+`requests` builds `files=` uploads entirely in memory. MultipartStream instead exposes a
+file-like object with a known length, so `requests` sends a Content-Length header and
+streams the body in chunks straight from disk (or any seekable binary stream).
+"""
+
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadFile:
+    """
+    A file to upload, opened lazily from a path or wrapping a caller-owned stream.
+
+    Args:
+        source: Path on disk or a seekable binary file-like object
+        filename: Name reported to Telegram (defaults to the path/stream name)
+    """
+
+    def __init__(self, source: str | Path | BinaryIO, filename: str | None = None):
+        if isinstance(source, (str, Path)):
+            self._path: Path | None = Path(source)
+            self._stream: BinaryIO | None = None
+            self._start = 0
+            self.filename = filename or self._path.name
+        else:
+            self._path = None
+            self._stream = source
+            self._start = source.tell()
+            self.filename = filename or os.path.basename(getattr(source, "name", "") or "file")
+
+    def open(self) -> BinaryIO:
+        """Return the underlying stream, opening the file on first use."""
+        if self._stream is None:
+            self._stream = open(self._path, "rb")
+        return self._stream
+
+    @property
+    def size(self) -> int:
+        """Size in bytes of the remaining content."""
+        stream = self.open()
+        try:
+            return os.fstat(stream.fileno()).st_size - self._start
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            current = stream.tell()
+            end = stream.seek(0, os.SEEK_END)
+            stream.seek(current)
+            return end - self._start
+
+    @property
+    def content_type(self) -> str:
+        return mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+
+    def rewind(self) -> None:
+        """Seek back to where the upload content starts."""
+        self.open().seek(self._start)
+
+    def sha256(self) -> str:
+        """Hash the content in chunks without loading it into memory."""
+        stream = self.open()
+        self.rewind()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+        self.rewind()
+        return digest.hexdigest()
+
+    def close(self) -> None:
+        """Close the stream if it was opened from a path (caller-owned streams stay open)."""
+        if self._path is not None and self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class MultipartStream:
+    """
+    Lazily-encoded multipart/form-data body.
+
+    Form fields are encoded up front (they are small); file parts are read on demand.
+    Deliberately not an io.IOBase: requests treats a failing tell() as "already consumed".
+    """
+
+    def __init__(self, fields: dict[str, Any], files: dict[str, UploadFile]):
+        self.boundary = uuid.uuid4().hex
+        self._parts: list[bytes | UploadFile] = []
+
+        for name, value in fields.items():
+            if value is None:
+                continue
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            elif isinstance(value, bool):
+                value = "true" if value else "false"
+            self._parts.append(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            )
+
+        for name, upload in files.items():
+            self._parts.append(
+                (
+                    f"--{self.boundary}\r\n"
+                    f'Content-Disposition: form-data; name="{name}"; filename="{upload.filename}"\r\n'
+                    f"Content-Type: {upload.content_type}\r\n\r\n"
+                ).encode()
+            )
+            self._parts.append(upload)
+            self._parts.append(b"\r\n")
+
+        self._parts.append(f"--{self.boundary}--\r\n".encode())
+        self._length = sum(len(p) if isinstance(p, bytes) else p.size for p in self._parts)
+        self.rewind()
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def rewind(self) -> None:
+        """Restart the body from the beginning (used when a request is retried)."""
+        self._index = 0
+        self._buffer = b""
+        for part in self._parts:
+            if isinstance(part, UploadFile):
+                part.rewind()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length
+
+        out = bytearray()
+        while len(out) < size:
+            if self._buffer:
+                take = self._buffer[: size - len(out)]
+                self._buffer = self._buffer[len(take) :]
+                out += take
+                continue
+
+            if self._index >= len(self._parts):
+                break
+
+            part = self._parts[self._index]
+            if isinstance(part, bytes):
+                self._buffer = part
+                self._index += 1
+                continue
+
+            chunk = part.open().read(min(CHUNK_SIZE, size - len(out)))
+            if chunk:
+                out += chunk
+            else:
+                self._index += 1
+
+        return bytes(out)
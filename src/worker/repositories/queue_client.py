@@ -0,0 +1,71 @@
+"""SQS client used by the worker to enqueue scheduled jobs on the updates queue."""
+
+import json
+from typing import Any
+
+from aws_lambda_powertools import Logger
+from repositories import DEFAULT_BOT_ID, QUEUE_URL
+from repositories.aws_clients import sqs_client
+
+logger = Logger()
+
+# Initialize SQS client globally to reuse TCP connections across Lambda invocations
+_SQS_CLIENT = sqs_client
+
+# SQS limits
+MAX_DELAY_SECONDS = 900
+MAX_BATCH_SIZE = 10
+
+
+class UpdatesQueueClient:
+    """Sends scheduled jobs to the updates queue, optionally delayed."""
+
+    def __init__(self, queue_url: str | None = QUEUE_URL) -> None:
+        self.queue_url = queue_url
+        self.sqs_client = _SQS_CLIENT
+
+    def send(self, body: dict[str, Any], delay_seconds: int = 0, bot_id: str = DEFAULT_BOT_ID) -> None:
+        """Send one message for `bot_id` with DelaySeconds (clamped to 0-900)."""
+        self.sqs_client.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=json.dumps(body),
+            DelaySeconds=_clamp_delay(delay_seconds),
+            MessageAttributes=_bot_attributes(bot_id),
+        )
+
+    def send_batch(self, entries: list[tuple[str, dict[str, Any], int, str]]) -> list[str]:
+        """
+        Send up to 10 messages with one SendMessageBatch call.
+
+        Args:
+            entries: (entry id, body, delay seconds, bot id) tuples
+
+        Returns:
+            IDs of the entries SQS accepted.
+        """
+        response = self.sqs_client.send_message_batch(
+            QueueUrl=self.queue_url,
+            Entries=[
+                {
+                    "Id": entry_id,
+                    "MessageBody": json.dumps(body),
+                    "DelaySeconds": _clamp_delay(delay),
+                    "MessageAttributes": _bot_attributes(bot_id),
+                }
+                for entry_id, body, delay, bot_id in entries
+            ],
+        )
+
+        for failure in response.get("Failed", []):
+            logger.error("Failed to enqueue scheduled job", extra={"failure": failure})
+
+        return [item["Id"] for item in response.get("Successful", [])]
+
+
+def _clamp_delay(delay_seconds: float) -> int:
+    return max(0, min(MAX_DELAY_SECONDS, int(delay_seconds)))
+
+
+def _bot_attributes(bot_id: str) -> dict[str, Any]:
+    """The "bot_id" message attribute the worker routes on, like the receiver sets it."""
+    return {"bot_id": {"DataType": "String", "StringValue": bot_id}}
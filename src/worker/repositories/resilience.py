@@ -0,0 +1,186 @@
+"""
+Resilience primitives for outbound Telegram API calls.
+
+- RetryPolicy: exponential backoff with full jitter.
+- Deadline: per-invocation time budget derived from the Lambda context.
+- CircuitBreaker: fails fast while Telegram is down instead of stalling every worker.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable
+
+import requests
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from urllib3.exceptions import NewConnectionError
+
+logger = Logger()
+metrics = Metrics()
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without touching the network while the circuit is open."""
+
+
+class DeadlineExceededError(requests.exceptions.Timeout):
+    """Raised when the invocation has no time left for another attempt."""
+
+
+def request_never_sent(error: BaseException) -> bool:
+    """
+    Whether a failed request certainly never reached the server, so repeating it cannot act twice.
+
+    True for an open circuit, a deadline hit before sending, a failure to connect and a 429
+    (throttled requests are not executed). Read timeouts, connections dropped mid-request and
+    5xx responses may all come after the server already acted.
+    """
+    if isinstance(error, (CircuitOpenError, DeadlineExceededError, requests.exceptions.ConnectTimeout)):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return _is_connect_failure(error)
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.exceptions.HTTPError) and response is not None and response.status_code == 429
+
+
+def _is_connect_failure(error: BaseException) -> bool:
+    """Whether a ConnectionError was raised while opening the connection (DNS, refused, unreachable)."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        # requests wraps urllib3's MaxRetryError, whose `reason` is the underlying error
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        if isinstance(error, NewConnectionError) or isinstance(reason, NewConnectionError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        max_attempts: Total attempts including the first one
+        base_delay: Backoff base in seconds
+        max_delay: Upper bound for a single backoff sleep in seconds
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Return the sleep before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class Deadline:
+    """
+    Time budget of the current Lambda invocation.
+
+    Bound once per invocation with `bind(context)`; outside Lambda (or before binding)
+    the budget is unlimited and callers fall back to their static timeouts.
+
+    Args:
+        safety_margin: Seconds kept in reserve so the handler can still log and return
+    """
+
+    def __init__(self, safety_margin: float = 1.0):
+        self.safety_margin = safety_margin
+        self._remaining_ms: Callable[[], int] | None = None
+
+    def bind(self, context: Any) -> None:
+        """Track the remaining time of a Lambda context (no-op if the context has none)."""
+        self._remaining_ms = getattr(context, "get_remaining_time_in_millis", None)
+
+    def remaining(self) -> float | None:
+        """Seconds left before the safety margin, or None when unbounded."""
+        if self._remaining_ms is None:
+            return None
+        return self._remaining_ms() / 1000 - self.safety_margin
+
+    def timeout(self, default: float) -> float:
+        """
+        Timeout for the next attempt: the static default capped by the remaining budget.
+
+        Raises:
+            DeadlineExceededError: If there is no budget left
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            raise DeadlineExceededError("Lambda deadline reached before Telegram request")
+        return min(default, remaining)
+
+    def allows(self, delay: float, min_attempt: float = 0.5) -> bool:
+        """Whether sleeping `delay` still leaves `min_attempt` seconds for another attempt."""
+        remaining = self.remaining()
+        return remaining is None or remaining - delay >= min_attempt
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open -> half-open after
+    `recovery_timeout` seconds, letting a single probe through; probe success closes it again.
+
+    State lives in the container, so a warm worker stops hammering Telegram during an outage.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """
+        Gate an outbound call.
+
+        Raises:
+            CircuitOpenError: While the circuit is open (or a half-open probe is in flight)
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                logger.info(f"Circuit {self.name} half-open, sending probe request")
+                self.state = self.HALF_OPEN
+                return
+
+        metrics.add_metric(name="TelegramCircuitRejected", unit=MetricUnit.Count, value=1)
+        raise CircuitOpenError(f"Circuit {self.name} is {self.state}, failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def release_probe(self) -> None:
+        """Return a half-open circuit to open when its probe ended without an outcome."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit {self.name} opened", extra={"failures": self._failures})
+                    metrics.add_metric(name="TelegramCircuitOpened", unit=MetricUnit.Count, value=1)
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
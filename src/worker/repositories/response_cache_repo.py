@@ -0,0 +1,49 @@
+"""
+Shared store for cached command responses.
+
+Lets every worker container reuse a rendered reply instead of re-running the handler.
+Entries expire via DynamoDB TTL; expired-but-not-yet-deleted items are filtered on read.
+"""
+
+import time
+
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+from repositories import TG_RESPONSE_CACHE_TABLE_NAME
+from repositories.aws_clients import dynamodb
+
+logger = Logger()
+
+
+class ResponseCacheRepository:
+    """DynamoDB-backed response cache keyed by an opaque string."""
+
+    def __init__(self, table_name: str = TG_RESPONSE_CACHE_TABLE_NAME):
+        self._table = dynamodb.Table(table_name)
+        logger.info("ResponseCacheRepository initialized", extra={"table_name": table_name})
+
+    def get(self, cache_key: str) -> list[str] | None:
+        """Return the cached replies for cache_key, or None if missing/expired."""
+        try:
+            response = self._table.get_item(Key={"cache_key": cache_key}, ConsistentRead=False)
+        except ClientError as e:
+            logger.warning(f"Response cache lookup failed for {cache_key}: {e}")
+            return None
+
+        item = response.get("Item")
+        if item is None or int(item.get("expires_at", 0)) <= time.time():
+            return None
+        return list(item.get("replies", []))
+
+    def put(self, cache_key: str, replies: list[str], ttl: float) -> None:
+        """Store replies for ttl seconds."""
+        try:
+            self._table.put_item(
+                Item={
+                    "cache_key": cache_key,
+                    "replies": replies,
+                    "expires_at": int(time.time() + ttl),
+                }
+            )
+        except ClientError as e:
+            logger.warning(f"Response cache persist failed for {cache_key}: {e}")
@@ -0,0 +1,93 @@
+"""
+Repository for scheduled (delayed) jobs in DynamoDB.
+
+Jobs are stored in minute buckets: partition key `bucket` (minute since epoch), sort key
+`job_id`. The sweeper fetches a due bucket with one paginated Query instead of scanning
+the table. Delivery markers (`done#<job_id>`) guarantee each job is executed at most once.
+"""
+
+import time
+from typing import Any, Iterator
+
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+from repositories import TG_SCHEDULED_JOBS_TABLE_NAME
+from repositories.aws_clients import dynamodb
+
+logger = Logger()
+
+BUCKET_SECONDS = 60
+
+# How long delivery markers and undelivered jobs are kept before DynamoDB TTL removes them
+RETENTION_SECONDS = 2 * 24 * 3600
+
+
+def bucket_for(timestamp: float) -> str:
+    """Return the bucket key (minute since epoch) a timestamp falls into."""
+    return str(int(timestamp // BUCKET_SECONDS))
+
+
+class ScheduledJobRepository:
+    """DynamoDB access for time-bucketed scheduled jobs."""
+
+    def __init__(self, table_name: str = TG_SCHEDULED_JOBS_TABLE_NAME):
+        self._table = dynamodb.Table(table_name)
+        logger.info("ScheduledJobRepository initialized", extra={"table_name": table_name})
+
+    def put_job(self, job: dict[str, Any]) -> None:
+        """Store a job in the bucket of its due time."""
+        self._table.put_item(
+            Item={
+                **job,
+                "bucket": bucket_for(job["due_at"]),
+                "expires_at": int(job["due_at"] + RETENTION_SECONDS),
+            }
+        )
+
+    def iter_bucket(self, bucket: str) -> Iterator[dict[str, Any]]:
+        """Yield every job in a bucket, following Query pagination."""
+        kwargs: dict[str, Any] = {
+            "KeyConditionExpression": "#bucket = :bucket",
+            "ExpressionAttributeNames": {"#bucket": "bucket"},
+            "ExpressionAttributeValues": {":bucket": bucket},
+        }
+        while True:
+            response = self._table.query(**kwargs)
+            yield from response.get("Items", [])
+
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
+    def delete_jobs(self, jobs: list[dict[str, Any]]) -> None:
+        """Delete dispatched jobs with batched writes (25 per BatchWriteItem)."""
+        with self._table.batch_writer() as batch:
+            for job in jobs:
+                batch.delete_item(Key={"bucket": job["bucket"], "job_id": job["job_id"]})
+
+    def claim_delivery(self, job_id: str) -> bool:
+        """
+        Atomically mark a job as delivered.
+
+        Returns:
+            True if this call claimed the job, False if it was already delivered.
+        """
+        try:
+            self._table.put_item(
+                Item={
+                    "bucket": f"done#{job_id}",
+                    "job_id": job_id,
+                    "expires_at": int(time.time() + RETENTION_SECONDS),
+                },
+                ConditionExpression="attribute_not_exists(job_id)",
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def release_delivery(self, job_id: str) -> None:
+        """Remove a job's delivery marker after a send that never reached Telegram, so it can be retried."""
+        self._table.delete_item(Key={"bucket": f"done#{job_id}", "job_id": job_id})
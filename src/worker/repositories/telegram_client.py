@@ -1,50 +1,409 @@
 """Telegram Bot API client."""
 
-from typing import Any
+import os
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
 
 import requests
-from aws_lambda_powertools import Logger
-from repositories import BOT_TOKEN, TELEGRAM_API_BASE
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from repositories import (
+    BOT_TOKEN,
+    DEFAULT_BOT_ID,
+    TELEGRAM_API_BASE,
+    TELEGRAM_CIRCUIT_FAILURE_THRESHOLD,
+    TELEGRAM_CIRCUIT_RECOVERY_SECONDS,
+    TELEGRAM_MAX_ATTEMPTS,
+)
+from repositories.file_id_cache import FileIdCache
+from repositories.multipart import MultipartStream, UploadFile
+from repositories.resilience import CircuitBreaker, Deadline, RetryPolicy, request_never_sent
 
 logger = Logger()
+metrics = Metrics()
+
+# Default timeouts (seconds) for JSON calls and streamed file uploads
+REQUEST_TIMEOUT = 10
+UPLOAD_TIMEOUT = 60
+PREWARM_TIMEOUT = 2
+
+# Bot API methods that show the user a reply (send*, edit*, answer*), for end-to-end lag tracking
+REPLY_METHOD_PREFIXES = ("send", "edit", "answer")
+
+# A file path / stream to upload, or a str file_id / URL Telegram fetches itself
+MediaSource = str | Path | BinaryIO
+
+
+def new_session() -> requests.Session:
+    """HTTP session for Bot API calls (the connection pool is per host, so any bot can use it)."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": "AWS-Serverless-Telegram-Bot/1.0"})
+    return session
 
 
 class TelegramClient:
     """Client for Telegram Bot API operations."""
 
-    def __init__(self) -> None:
-        """Initialize Telegram client."""
-        self.bot_token = BOT_TOKEN
+    def __init__(
+        self,
+        file_id_cache: FileIdCache | None = None,
+        bot_token: str | None = None,
+        bot_id: str = DEFAULT_BOT_ID,
+        session: requests.Session | None = None,
+    ) -> None:
+        """
+        Initialize Telegram client.
+
+        Args:
+            file_id_cache: Uploaded file_id cache (may be shared between bots)
+            bot_token: Token of the bot to act as (defaults to BOT_TOKEN)
+            bot_id: ID of the bot in this deployment, used to namespace per-bot state
+            session: HTTP session to reuse; clients of different bots share one keep-alive pool
+        """
+        self.bot_id = bot_id
+        self.bot_token = bot_token or BOT_TOKEN
         self.api_base = f"{TELEGRAM_API_BASE}{self.bot_token}"
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "AWS-Serverless-Telegram-Bot/1.0"})
+        self.session = session or new_session()
+        self.file_id_cache = file_id_cache or FileIdCache()
 
-    def send_message(
-        self, chat_id: str, text: str, parse_mode: str = "HTML", reply_markup: dict[str, Any] | None = None
-    ) -> None:
-        """Send message to Telegram."""
-        url = f"{self.api_base}/sendMessage"
+        # Resilience: retries, per-invocation deadline and a container-wide circuit breaker
+        self.retry_policy = RetryPolicy(max_attempts=TELEGRAM_MAX_ATTEMPTS)
+        self.deadline = Deadline()
+        self.circuit_breaker = CircuitBreaker(
+            "telegram" if bot_id == DEFAULT_BOT_ID else f"telegram:{bot_id}",
+            failure_threshold=TELEGRAM_CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=TELEGRAM_CIRCUIT_RECOVERY_SECONDS,
+        )
+
+        # Epoch seconds the last reply (send/edit/answer call) succeeded, for end-to-end lag tracking
+        self.last_reply_at: float | None = None
+
+    def _post(self, method: str, payload: dict[str, Any] | None = None, body: MultipartStream | None = None) -> Any:
+        """
+        Call a Bot API method and return its `result`.
+
+        Connection errors and 5xx responses are retried with jittered backoff, 429s after
+        the `retry_after` Telegram asks for, as long as the invocation deadline allows it.
+        Read timeouts are not retried: Telegram may already have delivered the message.
+        Raised request errors carry `may_have_been_sent`, set unless no attempt can have reached Telegram.
+
+        Args:
+            method: Bot API method name (e.g. "sendMessage")
+            payload: JSON payload
+            body: Streamed multipart body (file uploads), used instead of payload
+
+        Raises:
+            requests.exceptions.RequestException: On network errors or non-2xx responses
+            CircuitOpenError: While the Telegram circuit is open
+            DeadlineExceededError: When the Lambda invocation is about to time out
+        """
+        url = f"{self.api_base}/{method}"
+        default_timeout = UPLOAD_TIMEOUT if body is not None else REQUEST_TIMEOUT
+        attempt = 0
+
+        # Whether any attempt so far may have been acted on by Telegram (see request_never_sent)
+        maybe_sent = False
+
+        try:
+            while True:
+                attempt += 1
+                # Before the gate: running out of time must not strand a half-open probe
+                timeout = self.deadline.timeout(default_timeout)
+                self.circuit_breaker.before_request()
+                retry_after = None
+                recorded = False
+
+                try:
+                    try:
+                        if body is not None:
+                            body.rewind()
+                            response = self.session.post(
+                                url, data=body, headers={"Content-Type": body.content_type}, timeout=timeout
+                            )
+                        else:
+                            response = self.session.post(url, json=payload, timeout=timeout)
+                    except requests.exceptions.ConnectionError as e:
+                        self.circuit_breaker.record_failure()
+                        recorded = True
+                        error: requests.exceptions.RequestException = e
+                    except requests.exceptions.RequestException:
+                        # Read timeouts, broken chunked responses, ...: Telegram may have acted on the request
+                        self.circuit_breaker.record_failure()
+                        recorded = True
+                        raise
+                    else:
+                        if response.status_code >= 500:
+                            self.circuit_breaker.record_failure()
+                            recorded = True
+                            error = requests.exceptions.HTTPError(
+                                f"{response.status_code} Server Error for {method}", response=response
+                            )
+                        elif response.status_code == 429:
+                            self.circuit_breaker.record_success()
+                            recorded = True
+                            error = requests.exceptions.HTTPError(
+                                f"429 Too Many Requests for {method}", response=response
+                            )
+                            retry_after = _retry_after(response)
+                        else:
+                            self.circuit_breaker.record_success()
+                            recorded = True
+                            response.raise_for_status()
+                            if _is_reply(method):
+                                self.last_reply_at = time.time()
+                            return response.json().get("result")
+                finally:
+                    if not recorded:
+                        # No outcome (e.g. rewinding the upload failed): let a later call probe again
+                        self.circuit_breaker.release_probe()
+
+                maybe_sent = maybe_sent or not request_never_sent(error)
+                delay = retry_after if retry_after is not None else self.retry_policy.backoff(attempt)
+                if attempt >= self.retry_policy.max_attempts or not self.deadline.allows(delay):
+                    raise error
+
+                logger.warning(
+                    f"Retrying Telegram {method}",
+                    extra={"attempt": attempt, "delay": round(delay, 3), "error": str(error)},
+                )
+                metrics.add_metric(name="TelegramRetries", unit=MetricUnit.Count, value=1)
+                time.sleep(delay)
+        except requests.exceptions.RequestException as e:
+            # Callers that must not repeat a call (scheduled jobs) check this before retrying it
+            e.may_have_been_sent = maybe_sent or not request_never_sent(e)
+            raise
+
+    def prewarm(self) -> bool:
+        """
+        Open the keep-alive connection to the Bot API (DNS + TCP + TLS) with a cheap getMe call,
+        so the first real update does not pay the handshakes.
+
+        Returns:
+            True if the connection was established.
+        """
+        try:
+            # Straight to the session: a failed prewarm must not count against the circuit breaker
+            response = self.session.post(f"{self.api_base}/getMe", timeout=PREWARM_TIMEOUT)
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Telegram prewarm failed: {e}")
+            return False
 
+    def set_deadline(self, context: Any) -> None:
+        """Derive request timeouts from the current Lambda invocation's remaining time."""
+        self.deadline.bind(context)
+
+    def send_message(
+        self, chat_id: str, text: str, parse_mode: str | None = "HTML", reply_markup: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Send message to Telegram and return the sent Message."""
         payload = {
             "chat_id": chat_id,
             "text": text,
-            "parse_mode": parse_mode,
         }
 
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+
         if reply_markup:
             payload["reply_markup"] = reply_markup
 
         try:
-            response = self.session.post(url, json=payload, timeout=10)
-            response.raise_for_status()
+            return self._post("sendMessage", payload)
         except requests.exceptions.RequestException as e:
             logger.error(
                 "Failed to send message to Telegram",
-                extra={"chat_id": chat_id, "error": e},
-                extra={"response": e.response.text if e.response else "No response"},
+                extra={
+                    "chat_id": chat_id,
+                    "error": e,
+                    "response": e.response.text if e.response is not None else "No response",
+                },
             )
             raise
 
+    def edit_message_text(
+        self,
+        chat_id: str,
+        message_id: int,
+        text: str,
+        parse_mode: str | None = "HTML",
+        reply_markup: dict[str, Any] | None = None,
+    ) -> None:
+        """Edit the text of a previously sent message.
+
+        "Message is not modified" (same text sent twice) is treated as success.
+
+        Args:
+            chat_id: Telegram chat ID
+            message_id: Message ID
+            text: New text
+            parse_mode: Parse mode, or None for plain text
+            reply_markup: Optional inline keyboard
+        """
+        payload = {"chat_id": chat_id, "message_id": message_id, "text": text}
+
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+
+        if reply_markup:
+            payload["reply_markup"] = reply_markup
+
+        try:
+            self._post("editMessageText", payload)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and "message is not modified" in e.response.text:
+                return
+            logger.error("Failed to edit message", extra={"message_id": message_id, "error": e})
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to edit message", extra={"message_id": message_id, "error": e})
+            raise
+
+    def send_photo(
+        self,
+        chat_id: str,
+        photo: MediaSource,
+        caption: str | None = None,
+        parse_mode: str = "HTML",
+        reply_markup: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Send a photo, reusing a cached file_id when the same content was uploaded before.
+
+        Args:
+            chat_id: Telegram chat ID
+            photo: Path or binary stream to upload, or an existing file_id / URL
+            caption: Optional caption
+            parse_mode: Caption parse mode
+            reply_markup: Optional reply markup
+        """
+        fields = {"chat_id": chat_id, "caption": caption, "parse_mode": parse_mode if caption else None}
+        if reply_markup:
+            fields["reply_markup"] = reply_markup
+        return self._send_media("sendPhoto", "photo", photo, fields)
+
+    def send_document(
+        self,
+        chat_id: str,
+        document: MediaSource,
+        caption: str | None = None,
+        parse_mode: str = "HTML",
+        reply_markup: dict[str, Any] | None = None,
+        filename: str | None = None,
+    ) -> dict[str, Any]:
+        """Send a document, reusing a cached file_id when the same content was uploaded before.
+
+        Args:
+            chat_id: Telegram chat ID
+            document: Path or binary stream to upload, or an existing file_id / URL
+            caption: Optional caption
+            parse_mode: Caption parse mode
+            reply_markup: Optional reply markup
+            filename: File name shown to the user (defaults to the source name)
+        """
+        fields = {"chat_id": chat_id, "caption": caption, "parse_mode": parse_mode if caption else None}
+        if reply_markup:
+            fields["reply_markup"] = reply_markup
+        return self._send_media("sendDocument", "document", document, fields, filename=filename)
+
+    def send_media_group(self, chat_id: str, media: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Send an album of 2-10 photos/videos/documents/audios.
+
+        Every upload is hashed first; items already known to Telegram are sent by file_id and
+        only the remaining ones are streamed as `attach://` parts.
+
+        Args:
+            chat_id: Telegram chat ID
+            media: InputMedia dicts whose "media" is a path, binary stream, file_id or URL,
+                e.g. [{"type": "photo", "media": "/tmp/a.jpg", "caption": "A"}, ...]
+        """
+        input_media = []
+        uploads: dict[str, UploadFile] = {}
+        pending: dict[int, str] = {}  # index in album -> cache key of uploaded item
+
+        try:
+            for index, item in enumerate(media):
+                item = dict(item)
+                source = item["media"]
+
+                if _is_upload(source):
+                    upload = UploadFile(source)
+                    key = FileIdCache.make_key(item["type"], upload.sha256(), self.bot_id)
+                    cached = self.file_id_cache.get(key)
+
+                    if cached:
+                        item["media"] = cached
+                        upload.close()
+                    else:
+                        attach_name = f"file{index}"
+                        uploads[attach_name] = upload
+                        pending[index] = key
+                        item["media"] = f"attach://{attach_name}"
+
+                input_media.append(item)
+
+            if uploads:
+                body = MultipartStream({"chat_id": chat_id, "media": input_media}, uploads)
+                messages = self._post("sendMediaGroup", body=body)
+            else:
+                messages = self._post("sendMediaGroup", {"chat_id": chat_id, "media": input_media})
+
+            for index, key in pending.items():
+                file_id = _extract_file_id(media[index]["type"], messages[index])
+                if file_id:
+                    self.file_id_cache.put(key, file_id)
+
+            logger.info("Media group sent", extra={"items": len(media), "uploaded": len(uploads)})
+            return messages
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to send media group", extra={"chat_id": chat_id, "error": e})
+            raise
+        finally:
+            for upload in uploads.values():
+                upload.close()
+
+    def _send_media(
+        self,
+        method: str,
+        kind: str,
+        source: MediaSource,
+        fields: dict[str, Any],
+        filename: str | None = None,
+    ) -> dict[str, Any]:
+        """Send a single media item by file_id/URL, cached file_id, or streamed upload."""
+        try:
+            if not _is_upload(source):
+                return self._post(method, {**_drop_none(fields), kind: source})
+
+            upload = UploadFile(source, filename=filename)
+            try:
+                key = FileIdCache.make_key(kind, upload.sha256(), self.bot_id)
+                cached = self.file_id_cache.get(key)
+
+                if cached:
+                    logger.debug(f"Reusing cached file_id for {key}")
+                    try:
+                        return self._post(method, {**_drop_none(fields), kind: cached})
+                    except requests.exceptions.HTTPError as e:
+                        # A file_id Telegram no longer accepts: upload the content again
+                        if e.response is None or e.response.status_code != 400:
+                            raise
+                        logger.warning(f"Cached file_id rejected for {key}, re-uploading")
+
+                message = self._post(method, body=MultipartStream(fields, {kind: upload}))
+                file_id = _extract_file_id(kind, message)
+                if file_id:
+                    self.file_id_cache.put(key, file_id)
+                return message
+            finally:
+                upload.close()
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to {method}", extra={"chat_id": fields.get("chat_id"), "error": e})
+            raise
+
     def answer_callback_query(self, callback_query_id: str, text: str = None, show_alert: bool = False) -> None:
         """Answer callback query (must be called to dismiss loading state).
 
@@ -53,8 +412,6 @@ class TelegramClient:
             text: Text to send
             show_alert: If True, show text as alert instead of notification.
         """
-        url = f"{self.api_base}/answerCallbackQuery"
-
         payload = {"callback_query_id": callback_query_id}
         if text:
             payload["text"] = text
@@ -63,12 +420,86 @@ class TelegramClient:
             payload["show_alert"] = show_alert
 
         try:
-            response = self.session.post(url, json=payload, timeout=10)
-            response.raise_for_status()
+            self._post("answerCallbackQuery", payload)
         except requests.exceptions.RequestException as e:
             logger.error("Failed to answer callback query", extra={"error": e})
             raise
 
+    def answer_inline_query(
+        self,
+        inline_query_id: str,
+        results: list[dict[str, Any]],
+        cache_time: int = 300,
+        is_personal: bool = False,
+        next_offset: str | None = None,
+    ) -> bool:
+        """Answer an inline query.
+
+        Inline queries can only be answered for a few seconds; an answer that arrives too late
+        is logged and reported as False instead of raising.
+
+        Args:
+            inline_query_id: Inline query ID
+            results: InlineQueryResult objects (at most 50)
+            cache_time: Seconds Telegram may cache the results
+            is_personal: Cache the results on Telegram's side only for the user who sent the query
+            next_offset: Offset of the next page, sent back as the query's `offset` when the user scrolls
+
+        Returns:
+            True if the answer was accepted.
+        """
+        payload = {"inline_query_id": inline_query_id, "results": results, "cache_time": cache_time}
+
+        if is_personal:
+            payload["is_personal"] = is_personal
+
+        if next_offset:
+            payload["next_offset"] = next_offset
+
+        try:
+            self._post("answerInlineQuery", payload)
+            return True
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and "query is too old" in e.response.text:
+                logger.warning("Inline query expired unanswered", extra={"inline_query_id": inline_query_id})
+                return False
+            logger.error("Failed to answer inline query", extra={"error": e})
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to answer inline query", extra={"error": e})
+            raise
+
+    def get_chat_member(self, chat_id: int, user_id: int) -> dict[str, Any]:
+        """Get a member of a chat.
+
+        Args:
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+
+        Returns:
+            ChatMember object
+        """
+        try:
+            return self._post("getChatMember", {"chat_id": chat_id, "user_id": user_id})
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to get chat member", extra={"chat_id": chat_id, "user_id": user_id, "error": e})
+            raise
+
+    def get_chat_administrators(self, chat_id: int) -> list[dict[str, Any]]:
+        """Get the administrators of a chat.
+
+        Args:
+            chat_id: Telegram chat ID
+
+        Returns:
+            List of ChatMember objects
+        """
+        try:
+            return self._post("getChatAdministrators", {"chat_id": chat_id})
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to get chat administrators", extra={"chat_id": chat_id, "error": e})
+            raise
+
     def delete_message(self, chat_id: str, message_id: int) -> None:
         """Delete message from Telegram.
 
@@ -76,13 +507,45 @@ class TelegramClient:
             chat_id: Telegram chat ID
             message_id: Message ID
         """
-        url = f"{self.api_base}/deleteMessage"
-
         payload = {"chat_id": chat_id, "message_id": message_id}
 
         try:
-            response = self.session.post(url, json=payload, timeout=10)
-            response.raise_for_status()
+            self._post("deleteMessage", payload)
         except requests.exceptions.RequestException as e:
             logger.error("Failed to delete message", extra={"message_id": message_id, "error": e})
             raise
+
+
+def _is_upload(source: MediaSource) -> bool:
+    """A str is a file_id/URL unless it points at an existing file; paths and streams are uploads."""
+    if isinstance(source, str):
+        return os.path.isfile(source)
+    return True
+
+
+def _extract_file_id(kind: str, message: dict[str, Any]) -> str | None:
+    """Return the file_id Telegram assigned to the uploaded media in a sent Message."""
+    media = message.get(kind)
+    if kind == "photo" and media:
+        # Photos come back as a list of sizes; any size's file_id re-sends the original
+        return media[-1].get("file_id")
+    if isinstance(media, dict):
+        return media.get("file_id")
+    return None
+
+
+def _is_reply(method: str) -> bool:
+    """Whether a Bot API method shows the user a reply (lookups, deletes and chat actions do not)."""
+    return method.startswith(REPLY_METHOD_PREFIXES) and method != "sendChatAction"
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    """Read `parameters.retry_after` (seconds) from a Telegram 429 response."""
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _drop_none(fields: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in fields.items() if v is not None}
@@ -6,15 +6,13 @@ This is the ONLY layer that should interact with DynamoDB directly for user data
 import time
 from typing import Any
 
-import boto3
 from aws_lambda_powertools import Logger
 from botocore.exceptions import ClientError
 from repositories import TG_USERS_TABLE_NAME
+from repositories.aws_clients import dynamodb
 
 logger = Logger()
 
-dynamodb = boto3.resource("dynamodb")
-
 
 class UserRepository:
     """
@@ -27,6 +25,22 @@ class UserRepository:
         self._users_table = dynamodb.Table(TG_USERS_TABLE_NAME)
         logger.info("UserRepository initialized", extra={"table_name": TG_USERS_TABLE_NAME})
 
+    def prewarm(self) -> bool:
+        """
+        Open the keep-alive connection to DynamoDB (and resolve credentials) with a cheap
+        GetItem on a key that never exists. The DynamoDB resource is shared, so every
+        repository benefits.
+
+        Returns:
+            True if the connection was established.
+        """
+        try:
+            self._users_table.get_item(Key={"user_id": 0}, ConsistentRead=False)
+            return True
+        except Exception as e:
+            logger.warning(f"DynamoDB prewarm failed: {e}")
+            return False
+
     def register_user(self, user_id: int, username: str | None = None, first_name: str | None = None) -> None:
         """
         Register or update a Telegram user in DynamoDB with 24-hour debounce.
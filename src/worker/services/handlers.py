@@ -14,12 +14,14 @@ def register_handlers(dp: Dispatcher):
     """
 
     @dp.command("start")
+    @dp.cached(ttl=3600)
     def handle_start(ctx: Context):
         # Using our multi-language helper
         msg = get_translated_text("start_message", lang_code=ctx.lang_code)
         ctx.reply(msg)
 
     @dp.command("help")
+    @dp.cached(ttl=3600)
     def handle_help(ctx: Context):
         msg = get_translated_text("help_message", lang_code=ctx.lang_code)
         ctx.reply(msg)
@@ -0,0 +1,24 @@
+"""Sweeper Lambda: moves due scheduled jobs from DynamoDB onto the updates queue (runs every minute)."""
+
+from typing import Any
+
+from aws_lambda_powertools import Logger, Metrics
+from core.scheduler import Scheduler
+from repositories.queue_client import UpdatesQueueClient
+from repositories.scheduled_job_repository import ScheduledJobRepository
+from repositories.telegram_client import TelegramClient
+
+logger = Logger()
+metrics = Metrics()
+
+# Initialize OUTSIDE the handler to reuse connections across warm starts
+_scheduler = Scheduler(TelegramClient(), ScheduledJobRepository(), UpdatesQueueClient())
+
+
+@metrics.log_metrics
+def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, int]:
+    """
+    EventBridge scheduled event handler.
+    """
+    enqueued = _scheduler.sweep()
+    return {"enqueued": enqueued}